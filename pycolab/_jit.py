@@ -0,0 +1,51 @@
+# Copyright 2017 the pycolab Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Optional just-in-time compilation of small numerical kernels.
+
+Some pycolab code (mainly in the example games) can hand its inner loops to
+numba's `njit` compiler, which makes a big difference when games are played
+headlessly at high speed, e.g. to collect experience for an RL agent. Numba is
+not a pycolab dependency, though, so this is strictly opt-in: JIT compilation
+happens only if numba is installed *and* the `PYCOLAB_JIT` environment
+variable is set to something other than `0` or the empty string.
+
+Code that uses this module should decorate its kernels with `njit` and only
+call them when `ENABLED` is True, keeping its ordinary numpy implementation
+for everyone else. (When `ENABLED` is False, `njit` returns kernels unchanged,
+and explicit Python loops are much slower than numpy.)
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+
+try:
+  import numba
+except ImportError:
+  numba = None
+
+
+# True iff kernels decorated with `njit` are actually being compiled.
+ENABLED = (numba is not None and
+           os.environ.get('PYCOLAB_JIT', '0') not in ('', '0'))
+
+
+def njit(function):
+  """Compile `function` with `numba.njit` if `ENABLED`; else pass it through."""
+  if ENABLED:
+    return numba.njit(cache=True)(function)
+  return function
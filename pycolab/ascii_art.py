@@ -18,22 +18,30 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
 import itertools
 
 import numpy as np
 
+from pycolab import _jit
 from pycolab import engine
 from pycolab import things
 
 import six
 
 
+# Marks cells that hold no Sprite or Drape character in `ascii_art_to_game`'s
+# per-cell classification of the ASCII art.
+_NOT_AN_ENTITY = 255
+
+
 def ascii_art_to_game(art,
                       what_lies_beneath,
                       sprites=None, drapes=None, backdrop=things.Backdrop,
                       update_schedule=None,
                       z_order=None,
-                      occlusion_in_layers=True):
+                      occlusion_in_layers=True,
+                      cache=False):
   """Construct a pycolab game from an ASCII art diagram.
 
   This function helps to turn ASCII art diagrams like the following
@@ -76,7 +84,9 @@ def ascii_art_to_game(art,
   Args:
     art: An ASCII art diagram depicting a game board. This should be a list or
         tuple whose values are all strings containing the same number of ASCII
-        characters.
+        characters. A 2-D `uint8` numpy array like the ones made by
+        `ascii_art_to_uint8_nparray` works too, which spares games that build
+        lots of `Engine`s from re-parsing the same diagram over and over.
     what_lies_beneath: a single-character ASCII string that will be substituted
         into the `art` diagram at all places where a character that keys
         `sprites` or `drapes` is found; *or*, this can also be an entire second
@@ -129,6 +139,12 @@ def ascii_art_to_game(art,
         **NOTE: This flag also determines the occlusion behavior in `layers`
         arguments to all game entities' `update` methods; see docstrings in
         [things.py] for details.**
+    cache: If `True`, remember the game layout worked out from `art`,
+        `what_lies_beneath`, the characters in `sprites` and `drapes`,
+        `update_schedule`, and `z_order`, and reuse it in later calls where
+        these arguments are the same. This saves time for programs that build
+        the same game over and over, e.g. to reset a reinforcement learning
+        environment. Only `Engine` construction remains for those calls.
 
   Returns:
     An initialised `Engine` object as described.
@@ -140,24 +156,131 @@ def ascii_art_to_game(art,
         the requirements stipulated in Args:. The exception messages should make
         most errors fairly easy to debug.
   """
-  ### 1. Set default arguments, normalise arguments, derive various things ###
-
   # Convert sprites and drapes to be dicts of Partials only. "Bare" Sprite
   # and Drape classes become Partials with no args or kwargs.
-  if sprites is None: sprites = {}
-  if drapes is None: drapes = {}
-  sprites = {char: sprite if isinstance(sprite, Partial) else Partial(sprite)
-             for char, sprite in six.iteritems(sprites)}
-  drapes = {char: drape if isinstance(drape, Partial) else Partial(drape)
-            for char, drape in six.iteritems(drapes)}
+  sprites = _partials(sprites)
+  drapes = _partials(drapes)
 
   # Likewise, turn a bare Backdrop class into an argument-free Partial.
-  if not isinstance(backdrop, Partial): backdrop = Partial(backdrop)
+  backdrop = Partial.ensure(backdrop)
+
+  # Work out where everything goes, or recall where it went last time.
+  layout_args = (art, what_lies_beneath, tuple(sprites), tuple(drapes),
+                 update_schedule, z_order)
+  layout = (_cached_layout(*layout_args) if cache else
+            _compile_layout(*layout_args))
+
+  # Construct engine; populate with Sprites and Drapes according to the
+  # depth-first traversal of the update schedule. The sorted order of the
+  # update group identifiers matches the group ordering in the schedule, but is
+  # otherwise generic.
+  game = engine.Engine(*layout.backdrop_art.shape,
+                       occlusion_in_layers=occlusion_in_layers)
+
+  for i, update_group in enumerate(layout.update_schedule):
+    game.update_group('{:05d}'.format(i))
+    for character in update_group:
+      if character in drapes:
+        partial = drapes[character]
+        game.add_prefilled_drape(character, layout.curtains[character],
+                                 partial.pycolab_thing,
+                                 *partial.args, **partial.kwargs)
+      if character in sprites:
+        partial = sprites[character]
+        game.add_sprite(character, layout.positions[character],
+                        partial.pycolab_thing,
+                        *partial.args, **partial.kwargs)
+
+  # Impose specified Z-order, then add the Backdrop to the engine.
+  game.set_z_order(layout.z_order)
+  game.set_prefilled_backdrop(
+      characters=layout.backdrop_characters,
+      prefill=layout.backdrop_art,
+      backdrop_class=backdrop.pycolab_thing,
+      *backdrop.args, **backdrop.kwargs)
+
+  # That's all, folks!
+  return game
+
+
+# Everything `ascii_art_to_game` works out from its arguments before it starts
+# building the `Engine`:
+#   update_schedule: the update schedule as a list of lists of characters.
+#   z_order: the Z-order for Sprites and Drapes as a list of characters.
+#   curtains: a dict mapping each Drape character to its initial curtain.
+#   positions: a dict mapping each Sprite character to its initial position.
+#   backdrop_characters: a string of all the characters in `backdrop_art`.
+#   backdrop_art: the `uint8` ASCII art for the initial Backdrop curtain.
+# Arrays in a `_Layout` are read-only, since `Engine` copies them anyway.
+_Layout = collections.namedtuple(
+    '_Layout', ['update_schedule', 'z_order', 'curtains', 'positions',
+                'backdrop_characters', 'backdrop_art'])
+
+
+# `_Layout`s saved by `_cached_layout`, keyed by the arguments that made them.
+_LAYOUT_CACHE = {}
+
+# `_cached_layout` forgets all saved `_Layout`s once it has saved this many.
+_LAYOUT_CACHE_SIZE = 128
+
+
+def _cached_layout(art, what_lies_beneath, sprite_characters, drape_characters,
+                   update_schedule, z_order):
+  """Same as `_compile_layout`, but reuses results for repeated arguments."""
+  try:
+    key = _hashable((art, what_lies_beneath, sprite_characters,
+                     drape_characters, update_schedule, z_order))
+    layout = _LAYOUT_CACHE.get(key)
+  except TypeError:
+    # Arguments that can't be hashed can't be cached, and they're probably not
+    # valid arguments either. Let _compile_layout explain what's wrong.
+    key = layout = None
+
+  if layout is None:
+    layout = _compile_layout(art, what_lies_beneath, sprite_characters,
+                             drape_characters, update_schedule, z_order)
+    if key is not None:
+      if len(_LAYOUT_CACHE) >= _LAYOUT_CACHE_SIZE: _LAYOUT_CACHE.clear()
+      _LAYOUT_CACHE[key] = layout
+  return layout
+
+
+def _hashable(value):
+  """Convert lists, tuples, and numpy arrays in `value` into hashable values."""
+  if isinstance(value, np.ndarray):
+    return value.shape, value.dtype.str, value.tobytes()
+  if isinstance(value, (list, tuple)):
+    return tuple(_hashable(item) for item in value)
+  return value
+
+
+def _compile_layout(art, what_lies_beneath, sprite_characters, drape_characters,
+                    update_schedule, z_order):
+  """Work out everything `ascii_art_to_game` needs to build its `Engine`.
+
+  Args:
+    art: as passed to `ascii_art_to_game`.
+    what_lies_beneath: as passed to `ascii_art_to_game`.
+    sprite_characters: a collection of the keys of `ascii_art_to_game`'s
+        `sprites` argument.
+    drape_characters: a collection of the keys of `ascii_art_to_game`'s
+        `drapes` argument.
+    update_schedule: as passed to `ascii_art_to_game`.
+    z_order: as passed to `ascii_art_to_game`.
+
+  Returns:
+    A `_Layout`.
+
+  Raises:
+    TypeError: as described in `ascii_art_to_game`.
+    ValueError: as described in `ascii_art_to_game`.
+  """
+  ### 1. Set default arguments, normalise arguments, derive various things ###
 
   # Compile characters corresponding to all Sprites and Drapes.
   non_backdrop_characters = set()
-  non_backdrop_characters.update(sprites.keys())
-  non_backdrop_characters.update(drapes.keys())
+  non_backdrop_characters.update(sprite_characters)
+  non_backdrop_characters.update(drape_characters)
   if update_schedule is None: update_schedule = list(non_backdrop_characters)
 
   # If update_schedule is a string (someone wasn't reading the docs!),
@@ -180,9 +303,11 @@ def ascii_art_to_game(art,
     raise ValueError('if specified, update_schedule must list each sprite and '
                      'drape exactly once.')
 
-  # The default z-order is derived from there.
-  if z_order is None: z_order = flat_update_schedule
-  if set(z_order) != non_backdrop_characters:
+  # The default z-order is derived from there, so only a z-order supplied by
+  # the caller needs checking.
+  if z_order is None:
+    z_order = flat_update_schedule
+  elif set(z_order) != non_backdrop_characters:
     raise ValueError('if specified, z_order must list each sprite and drape '
                      'exactly once.')
 
@@ -195,31 +320,29 @@ def ascii_art_to_game(art,
         'a list of ASCII-character strings')
 
   # Note that the what_lies_beneath check works for characters and lists both.
+  # ord() raises TypeError for anything that isn't a single character.
   try:
-    _ = [ord(character) for character in ''.join(what_lies_beneath)]
-    _ = [ord(character) for character in non_backdrop_characters]
-    _ = [ord(character) for character in z_order]
-    _ = [ord(character) for character in flat_update_schedule]
+    all_ascii = all(ord(character) < 128 for character in itertools.chain(
+        ''.join(what_lies_beneath), non_backdrop_characters, z_order,
+        flat_update_schedule))
   except TypeError:
+    all_ascii = False
+  if not all_ascii:
     raise ValueError(
         'keys of sprites, keys of drapes, what_lies_beneath (or its entries), '
         'values in z_order, and (possibly nested) values in update_schedule '
         'must all be single-character ASCII strings.')
 
-  if non_backdrop_characters.intersection(''.join(what_lies_beneath)):
-    raise ValueError(
-        'any character specified in what_lies_beneath must not be one of the '
-        'characters used as keys in the sprites or drapes arguments.')
-
   ### 3. Convert all ASCII art to numpy arrays ###
 
   # Now convert the ASCII art array to a numpy array of uint8s.
   art = ascii_art_to_uint8_nparray(art)
 
   # In preparation for masking out sprites and drapes from the ASCII art array
-  # (to make the background), do similar for what_lies_beneath.
+  # (to make the background), do similar for what_lies_beneath. A single
+  # character becomes a uint8 scalar, which numpy broadcasts across the board.
   if isinstance(what_lies_beneath, str):
-    what_lies_beneath = np.full_like(art, ord(what_lies_beneath))
+    what_lies_beneath = np.uint8(ord(what_lies_beneath))
   else:
     what_lies_beneath = ascii_art_to_uint8_nparray(what_lies_beneath)
     if art.shape != what_lies_beneath.shape:
@@ -227,105 +350,171 @@ def ascii_art_to_game(art,
           'if not a single ASCII character, what_lies_beneath must be ASCII '
           'art whose shape is the same as that of the ASCII art in art.')
 
-  ### 4. Other miscellaneous preparation ###
+  ### 4. Classify every cell in the ASCII art ###
 
-  # This dict maps the characters associated with Sprites and Drapes to an
-  # identifier for the update group to which they belong. The sorted order of
-  # the identifiers matches the group ordering in update_schedule, but is
-  # otherwise generic.
-  update_group_for = {}
-  for i, update_group in enumerate(update_schedule):
-    group_id = '{:05d}'.format(i)
-    update_group_for.update({character: group_id for character in update_group})
-
-  ### 5. Construct engine; populate with Sprites and Drapes ###
-
-  game = engine.Engine(*art.shape, occlusion_in_layers=occlusion_in_layers)
-
-  # Sprites and Drapes are added according to the depth-first traversal of the
-  # update schedule.
-  for character in flat_update_schedule:
-    # Switch to this character's update group.
-    game.update_group(update_group_for[character])
-    # Find locations where this character appears in the ASCII art.
-    mask = art == ord(character)
-
-    if character in drapes:
-      # Add the drape to the Engine.
-      partial = drapes[character]
-      game.add_prefilled_drape(character, mask,
-                               partial.pycolab_thing,
-                               *partial.args, **partial.kwargs)
-
-    if character in sprites:
-      # Get the location of the sprite in the ASCII art, if there was one.
-      row, col = np.where(mask)
-      if len(row) > 1:
-        raise ValueError('sprite character {} can appear in at most one place '
-                         'in art.'.format(character))
-      # If there was a location, convert it to integer values; otherwise, 0,0.
-      # gpylint doesn't know how implicit bools work with numpy arrays...
-      row, col = (int(row), int(col)) if len(row) > 0 else (0, 0)  # pylint: disable=g-explicit-length-test
-
-      # Add the sprite to the Engine.
-      partial = sprites[character]
-      game.add_sprite(character, (row, col),
-                      partial.pycolab_thing,
-                      *partial.args, **partial.kwargs)
-
-    # Clear out the newly-added Sprite or Drape from the ASCII art.
-    art[mask] = what_lies_beneath[mask]
-
-  ### 6. Impose specified Z-order ###
-
-  game.set_z_order(z_order)
-
-  ### 7. Add the Backdrop to the engine ###
+  # Find everything in a single pass: entity_ids holds the index into
+  # flat_update_schedule of the Sprite or Drape character in each cell, or
+  # _NOT_AN_ENTITY for cells that belong to the Backdrop.
+  # At the same time, clear out all of the Sprites and Drapes from the ASCII
+  # art. The art is our own copy, so we can do this in place.
+  entity_id_for = np.full(256, _NOT_AN_ENTITY, dtype=np.uint8)
+  for i, character in enumerate(flat_update_schedule):
+    entity_id_for[ord(character)] = i
 
-  game.set_prefilled_backdrop(
-      characters=''.join(chr(c) for c in np.unique(art)),
-      prefill=art.view(np.uint8),
-      backdrop_class=backdrop.pycolab_thing,
-      *backdrop.args, **backdrop.kwargs)
+  # The same table tells us whether what_lies_beneath has any Sprite or Drape
+  # characters in it, which isn't allowed.
+  if np.any(entity_id_for[what_lies_beneath] != _NOT_AN_ENTITY):
+    raise ValueError(
+        'any character specified in what_lies_beneath must not be one of the '
+        'characters used as keys in the sprites or drapes arguments.')
 
-  # That's all, folks!
-  return game
+  if _jit.ENABLED:
+    entity_ids = _classify_and_clear(
+        art, entity_id_for, np.array(what_lies_beneath, ndmin=2))
+  else:
+    entity_ids = entity_id_for[art]
+    np.copyto(art, what_lies_beneath, where=entity_ids != _NOT_AN_ENTITY)
+  art.flags.writeable = False
+
+  # Drape curtains mark the locations where their characters appear in the art.
+  curtains = {}
+  for character in drape_characters:
+    curtains[character] = entity_ids == entity_id_for[ord(character)]
+    curtains[character].flags.writeable = False
+
+  positions = {}
+  for character in sprite_characters:
+    # Get the location of the sprite in the ASCII art, if there was one, as
+    # an index into the flattened art.
+    where = np.flatnonzero(entity_ids == entity_id_for[ord(character)])
+    if len(where) > 1:
+      raise ValueError('sprite character {} can appear in at most one place '
+                       'in art.'.format(character))
+    # If there was a location, convert it to integer values; otherwise, 0,0.
+    # gpylint doesn't know how implicit bools work with numpy arrays...
+    positions[character] = (
+        divmod(int(where[0]), art.shape[1]) if len(where) > 0 else (0, 0))  # pylint: disable=g-explicit-length-test
+
+  # The Backdrop gets whichever characters are left in the art. Marking them in
+  # a table of all 256 byte values finds them without sorting the whole board.
+  backdrop_characters = np.zeros(256, dtype=np.bool_)
+  backdrop_characters[art.ravel()] = True
+
+  return _Layout(
+      update_schedule=[list(update_group) for update_group in update_schedule],
+      z_order=list(z_order),
+      curtains=curtains,
+      positions=positions,
+      backdrop_characters=np.flatnonzero(backdrop_characters).astype(
+          np.uint8).tobytes().decode('ascii'),
+      backdrop_art=art)
+
+
+@_jit.njit
+def _classify_and_clear(art, entity_id_for, what_lies_beneath):
+  """Compiled `entity_id_for[art]` that also clears entities from `art`.
+
+  Does the same work as the two numpy calls used in `_compile_layout` when
+  `_jit.ENABLED` is False, but in a single pass over the art, which helps with
+  very large boards.
+
+  Args:
+    art: 2-D `uint8` ASCII art. Cells whose characters have an entry other than
+        `_NOT_AN_ENTITY` in `entity_id_for` are overwritten in place with the
+        corresponding cells from `what_lies_beneath`.
+    entity_id_for: 256-element `uint8` lookup table from characters to entity
+        indices.
+    what_lies_beneath: 2-D `uint8` ASCII art of the same shape as `art`, or a
+        1x1 array that applies everywhere.
+
+  Returns:
+    `entity_id_for[art]`, computed before `art` was modified.
+  """
+  rows, cols = art.shape
+  everywhere = what_lies_beneath.shape == (1, 1)
+  entity_ids = np.empty((rows, cols), dtype=np.uint8)
+  for row in range(rows):
+    for col in range(cols):
+      entity_id = entity_id_for[art[row, col]]
+      entity_ids[row, col] = entity_id
+      if entity_id != _NOT_AN_ENTITY:
+        if everywhere:
+          art[row, col] = what_lies_beneath[0, 0]
+        else:
+          art[row, col] = what_lies_beneath[row, col]
+  return entity_ids
+
+
+def _partials(things_by_character):
+  """Copy a dict of `Partial`s and/or bare classes, making all values `Partial`s.
+
+  Args:
+    things_by_character: a dict mapping characters to `Partial` objects or to
+        `Sprite` or `Drape` classes, as passed to `ascii_art_to_game`; or None.
+
+  Returns:
+    A new dict mapping the same characters to `Partial` objects. Bare classes
+    become `Partial`s with no args or kwargs. If `things_by_character` is None,
+    the dict is empty.
+  """
+  if not things_by_character: return {}
+  return {char: Partial.ensure(thing)
+          for char, thing in six.iteritems(things_by_character)}
 
 
 def ascii_art_to_uint8_nparray(art):
   """Construct a numpy array of dtype `uint8` from an ASCII art diagram.
 
   This function takes ASCII art diagrams (expressed as lists or tuples of
-  equal-length strings) and derives 2-D numpy arrays with dtype `uint8`.
+  equal-length strings) and derives 2-D numpy arrays with dtype `uint8`. If it
+  is given a diagram that has already been converted to such an array, it just
+  returns a copy.
 
   Args:
     art: An ASCII art diagram; this should be a list or tuple whose values are
-        all strings containing the same number of ASCII characters.
+        all strings containing the same number of ASCII characters, or a 2-D
+        `uint8` numpy array of ASCII values.
 
   Returns:
-    A 2-D numpy array as described.
+    A 2-D, C-contiguous numpy array as described. It never shares memory with
+    `art`.
 
   Raises:
     ValueError: `art` wasn't an ASCII art diagram, as described; this could be
       because the strings it is made of contain non-ASCII characters, or do not
-      have constant length.
+      have constant length, or because it's a numpy array of the wrong shape or
+      dtype.
     TypeError: `art` was not a list of strings.
   """
   error_text = (
       'the argument to ascii_art_to_uint8_nparray must be a list (or tuple) '
       'of strings containing the same number of strictly-ASCII characters.')
+  if isinstance(art, np.ndarray):
+    # ASCII values never have their high bit set. OR-ing all of the values
+    # together checks this without building a temporary boolean array.
+    if (art.ndim != 2 or art.dtype != np.uint8 or
+        np.bitwise_or.reduce(art, axis=None) & 0x80):
+      raise ValueError('{} (or a 2-D uint8 numpy array of ASCII values)'.format(
+          error_text))
+    return np.array(art, order='C')
   try:
-    art = np.vstack([np.frombuffer(line.encode('ascii'), dtype=np.uint8)
-                     for line in art])
-  except AttributeError as e:
+    # Encoding all of the rows in one go is much faster than encoding them one
+    # at a time and stacking the results.
+    characters = bytearray(''.join(art), 'ascii')
+    if not art or any(len(line) != len(art[0]) for line in art):
+      # The rows are ragged (or missing). Stack them one at a time after all,
+      # and let numpy explain what's wrong.
+      np.vstack([np.frombuffer(line.encode('ascii'), dtype=np.uint8)
+                 for line in art])
+  except TypeError as e:
     if isinstance(art, (list, tuple)) and all(
         isinstance(row, (list, tuple)) for row in art):
       error_text += ' Did you pass a list of list of single characters?'
     raise TypeError('{} (original error: {})'.format(error_text, e))
   except ValueError as e:
     raise ValueError('{} (original error from numpy: {})'.format(error_text, e))
-  if np.any(art > 127): raise ValueError(error_text)
-  return art
+  # No need to check for non-ASCII values: the 'ascii' codec rejects them.
+  return np.frombuffer(characters, dtype=np.uint8).reshape(len(art), -1)
 
 
 class Partial(object):
@@ -362,3 +551,22 @@ class Partial(object):
     self.pycolab_thing = pycolab_thing
     self.args = args
     self.kwargs = kwargs
+
+  @classmethod
+  def ensure(cls, thing_or_partial):
+    """Wrap a bare pycolab "thing" class in a `Partial`, if it isn't one already.
+
+    Args:
+      thing_or_partial: a `Partial` object; or a `Backdrop`, `Sprite`, or
+          `Drape` subclass.
+
+    Returns:
+      `thing_or_partial` itself if it's a `Partial`; otherwise, a new `Partial`
+      holding `thing_or_partial` and no "extra" constructor arguments.
+
+    Raises:
+      TypeError: `thing_or_partial` was neither a `Partial` nor a `Backdrop`,
+          `Sprite`, or `Drape` subclass.
+    """
+    if isinstance(thing_or_partial, Partial): return thing_or_partial
+    return cls(thing_or_partial)
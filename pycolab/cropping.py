@@ -18,13 +18,22 @@ from __future__ import absolute_import
 from __future__ import division
 from __future__ import print_function
 
+import collections
 import copy
 
+try:
+  from collections import abc as collections_abc
+except ImportError:  # Python 2.
+  import collections as collections_abc
+
 import numpy as np
 
+from pycolab import _jit
 from pycolab import rendering
 
-import six
+
+# How many pre-allocated cropped observations an `ObservationCropper` keeps.
+_CROPPED_POOL_SIZE = 4
 
 
 class ObservationCropper(object):
@@ -54,6 +63,14 @@ class ObservationCropper(object):
   """
 
   def __init__(self):
+    # Subclasses that use _do_crop will set these in their own constructors.
+    self._pad_char = None
+    self._view_ok = False
+    self._lazy_layers = False
+    # Pre-allocated observations that _do_crop has cropped into, most recently
+    # used last. Unlike self._cropped, these survive changes of game engine, so
+    # that e.g. every level of a game can reuse the same memory.
+    self._cropped_pool = collections.OrderedDict()
     self._set_engine_root_impl(None)
 
   def set_engine(self, engine):
@@ -107,13 +124,34 @@ class ObservationCropper(object):
     # This method is the core of what set_engine does, but it's also helpful for
     # the constructor, so we keep it outside of set_engine so that __init__ can
     # call it without worrying about overrides.
+    if (self._lazy_layers and engine is not None and
+        not engine.occlusion_in_layers): raise ValueError(
+            'An ObservationCropper with lazy_layers can only be used with a '
+            'pycolab engine that was built with occlusion_in_layers=True.')
     self._engine = engine
     # Padding characters known to be OK for the current game engine.
     self._valid_pad_chars = set(
         [] if self._engine is None else
         list(self._engine.things) + list(self._engine.backdrop.palette))
-    # Pre-allocated observation, for speed.
+    # Pre-allocated observation, for speed, and the 3-D array that holds all of
+    # its layers.
     self._cropped = None
+    self._cropped_layers = None
+    # Which of the layers in self._cropped_layers is filled in by padding, as a
+    # (layers, 1, 1) boolean array that broadcasts over self._cropped_layers.
+    self._pad_layers = None
+    # The observation shape and cropping window bounds of the last crop into
+    # self._cropped, and how that crop copied data: the slice of the observation
+    # it copied, whether that slice covered the whole cropping window, and the
+    # board and (char, layer) views in self._cropped that received the copy.
+    self._crop_geometry = None
+    self._crop_plan = None
+    # The layers dict of the last observation cropped into self._cropped.
+    self._cropped_layers_source = None
+    # For croppers that may return views of the observation instead of copies:
+    # the last such view, and the board and layers of the observation it views.
+    self._view = None
+    self._view_source = None
 
   def _do_crop(self, observation,
                top_row, left_col, bottom_row_exclusive, right_col_exclusive,
@@ -128,6 +166,11 @@ class ObservationCropper(object):
     `pad_char` must be one of the characters associated with the game's
     `Sprite`s, `Drape`s, or `Backdrop`.
 
+    The cropped observation's board has the same dtype as the board of
+    `observation`---`uint8`, for observations from the game engine---and, like
+    its layers, is a C-contiguous array, so copies into it are plain `memcpy`s
+    along each row.
+
     For speed, the cropped observation is computed by manipulating the
     instance variable `self._cropped`; thus, this method is not thread-safe.
     One workaround for applications that need thread safety would be to call
@@ -146,7 +189,12 @@ class ObservationCropper(object):
 
     Returns:
       an observation cropped as described. You must copy this observation if
-      you need it to last longer than the next call to `_do_crop`.
+      you need it to last longer than the next call to `_do_crop`. If
+      `self._view_ok` is True and the cropping window lies entirely inside
+      `observation`, the cropped observation is made of views into
+      `observation`, so the same goes for the next game iteration. If
+      `self._lazy_layers` is True, the cropped observation's `layers` are
+      computed from its `board` on demand.
 
     Raises:
       ValueError: `pad_char` is not a character used by `Sprite`s, `Drape`s, or
@@ -160,77 +208,198 @@ class ObservationCropper(object):
 
     ### 1. Prepare the observation that recevies the crop. ###
 
-    # See whether we need to allocate a new cropped observation. This is a
-    # superficial check; it doesn't detect rare cases where the types of
-    # characters in an observation have changed. We have a backup plan for that,
-    # though; look for the KeyError exception handler below.
+    # See whether we need a different cropped observation (which may mean
+    # allocating a new one). Besides checking its size, we must make sure it has
+    # layers for the same characters as the observation. The engine renders
+    # every observation's layers into the same dict, so we only check the
+    # characters themselves when we see a dict for the first time; otherwise,
+    # it's rare for the characters in an observation to change.
     if (self._cropped is None or
         self._cropped.board.shape != (crop_rows, crop_cols) or
-        len(self._cropped.layers) != len(observation.layers)):
-      self._cropped = rendering.Observation(
-          board=np.zeros((crop_rows, crop_cols), dtype=observation.board.dtype),
-          layers={c: np.zeros((crop_rows, crop_cols), dtype=bool)
-                  for c in observation.layers})
+        len(self._cropped.layers) != len(observation.layers) or
+        (observation.layers is not self._cropped_layers_source and
+         not all(char in observation.layers for char in self._cropped.layers))):
+      self._use_cropped_for(observation, crop_rows, crop_cols)
+    self._cropped_layers_source = observation.layers
+
+    # If the cropping window and the observation are just where they were the
+    # last time we cropped into self._cropped, then so is all of the padding,
+    # and we already know which slices of data to copy. This is the usual case
+    # for FixedCroppers, and for ScrollingCroppers that aren't scrolling.
+    geometry = (obs_rows, obs_cols,
+                top_row, left_col, bottom_row_exclusive, right_col_exclusive)
+    if geometry != self._crop_geometry:
+      if self._pad_char is None:
+        # If there is no padding, verify that the cropping window does not
+        # extend outside of the observation.
+        if (top_row < 0 or left_col < 0 or
+            bottom_row_exclusive > obs_rows or right_col_exclusive > obs_cols):
+          raise RuntimeError(
+              'An ObservationCropper attempted to crop a region that extends '
+              'beyond the observation without specifying a character to fill '
+              'the void that exists out there.')
+      elif self._pad_char not in self._valid_pad_chars: raise ValueError(
+          'An `ObservationCropper` tried to fill empty space with a '
+          'character that isn\'t used by the current game engine.')
+
+      ### 2. Compute the slices of data to copy, and pad around them. ###
+
+      # Figure out the portion of the observation covered by the cropping
+      # window.
+      from_tr = max(0, top_row)
+      from_lc = max(0, left_col)
+      from_bre = max(0, min(obs_rows, bottom_row_exclusive))
+      from_rce = max(0, min(obs_cols, right_col_exclusive))
+      from_slice = np.s_[from_tr:from_bre, from_lc:from_rce]
+
+      # Figure out where that portion will be placed in the cropped observation.
+      to_tr = max(0, -top_row)
+      to_lc = max(0, -left_col)
+      to_bre = min(crop_rows, max(0, obs_rows - top_row))
+      to_rce = min(crop_cols, max(0, obs_cols - left_col))
+      to_slice = np.s_[to_tr:to_bre, to_lc:to_rce]
+
+      # If there's padding, fill the observation with the padding character
+      # everywhere the copy won't overwrite: the strips above, below, left,
+      # and right of to_slice. (If the cropping window doesn't overlap the
+      # observation at all, the first two strips cover everything.) In the
+      # common case where the window lies entirely inside the observation,
+      # there's nothing to pad.
+      full_cover = (to_tr == 0 and to_lc == 0 and
+                    to_bre == crop_rows and to_rce == crop_cols)
+      if self._pad_char is not None and not full_cover:
+        pad_value = ord(self._pad_char)
+        for strip in (np.s_[:to_tr, :], np.s_[to_bre:, :],
+                      np.s_[to_tr:to_bre, :to_lc],
+                      np.s_[to_tr:to_bre, to_rce:]):
+          self._cropped.board[strip] = pad_value
+          self._cropped_layers[(Ellipsis,) + strip] = self._pad_layers
+
+      # The parts of the cropped observation that the copy will overwrite. We
+      # keep views of them so that we don't slice them out anew on each crop.
+      self._crop_geometry = geometry
+      self._view = None
+      self._crop_plan = (
+          from_slice, full_cover, self._cropped.board[to_slice],
+          [(char, layer[to_slice])
+           for char, layer in self._cropped.layers.items()])
+
+    from_slice, full_cover, board_target, layer_targets = self._crop_plan
+
+    # If we're allowed to, return views of the observation instead of a copy
+    # when the cropping window lies entirely inside of it. The engine reuses the
+    # same arrays for every observation it renders, so we can reuse the views,
+    # too, until the cropping window moves.
+    if self._view_ok and full_cover:
+      if (self._view is None or
+          self._view_source[0] is not observation.board or
+          self._view_source[1] is not observation.layers):
+        self._view = rendering.Observation(
+            board=observation.board[from_slice],
+            layers={char: layer[from_slice]
+                    for char, layer in observation.layers.items()})
+        self._view_source = (observation.board, observation.layers)
+      return self._view
+
+    ### 3. Copy the data into the cropped observation. ###
+
+    board_target[...] = observation.board[from_slice]
+    # Lazy layers are computed from the board we just copied, so there's nothing
+    # else to copy.
+    if self._lazy_layers:
+      return rendering.Observation(
+          board=self._cropped.board,
+          layers=_LazyLayers(self._cropped.board, observation.layers))
+
+    for char, layer_target in layer_targets:
+      layer_target[...] = observation.layers[char][from_slice]
 
-    if self._pad_char is None:
-      # If there is no padding, verify that the cropping window does not extend
-      # outside of the observation.
-      if (top_row < 0 or left_col < 0 or
-          bottom_row_exclusive > obs_rows or right_col_exclusive > obs_cols):
-        raise RuntimeError(
-            'An ObservationCropper attempted to crop a region that extends '
-            'beyond the observation without specifying a character to fill the '
-            'void that exists out there.')
-    else:
-      # Otherwise, pre-fill the observation with the padding character.
-      if self._pad_char not in self._valid_pad_chars: raise ValueError(
-          'An `ObservationCropper` tried to fill empty space with a character '
-          'that isn\'t used by the current game engine.')
-      self._cropped.board.fill(ord(self._pad_char))
-      for char, layer in six.iteritems(self._cropped.layers):
-        layer.fill(self._pad_char == char)
-
-    ### 2. Compute the slices of data that we will copy. ###
-
-    # Figure out the portion of the observation covered by the cropping window.
-    from_tr = max(0, top_row)
-    from_lc = max(0, left_col)
-    from_bre = max(0, min(obs_rows, bottom_row_exclusive))
-    from_rce = max(0, min(obs_cols, right_col_exclusive))
-    from_slice = np.s_[from_tr:from_bre, from_lc:from_rce]
-
-    # Figure out where that portion will be placed in the cropped observation.
-    to_tr = max(0, -top_row)
-    to_lc = max(0, -left_col)
-    to_bre = min(crop_rows, max(0, obs_rows - top_row))
-    to_rce = min(crop_cols, max(0, obs_cols - left_col))
-    to_slice = np.s_[to_tr:to_bre, to_lc:to_rce]
-
-    ### 3. Attempt to copy the data into the cropped observation. ###
-
-    self._cropped.board[to_slice] = observation.board[from_slice]
-    # It's here in the copy where we might discover that we need to allocate a
-    # new cropped observation after all---it happens when a layer we'd like to
-    # copy turns out not to exist in the observation. We abandon the
-    # pre-allocated observation and start all over again. Fairly inefficient,
-    # but it should happen only very rarely.
+    return self._cropped
+
+  def _use_cropped_for(self, observation, crop_rows, crop_cols):
+    """Helper for `_do_crop`: get an observation to crop `observation` into.
+
+    Finds a pre-allocated observation in `self._cropped_pool` with the right
+    size, board type, and layers to receive a `crop_rows` by `crop_cols` crop
+    of `observation`, allocating a new one (and evicting the least recently
+    used one) if there isn't one. The observation becomes `self._cropped`.
+
+    Args:
+      observation: `Observation` that will be cropped.
+      crop_rows: height of the cropping window.
+      crop_cols: width of the cropping window.
+    """
+    key = (crop_rows, crop_cols, observation.board.dtype,
+           frozenset(observation.layers))
     try:
-      for char, layer in six.iteritems(self._cropped.layers):
-        layer[to_slice] = observation.layers[char][from_slice]
+      cropped = self._cropped_pool.pop(key)
     except KeyError:
-      self._cropped = None
-      return self._do_crop(
-          observation,
-          top_row, left_col, bottom_row_exclusive, right_col_exclusive,
-          pad_char)
+      # All of the cropped layers are views into a single 3-D array, so that we
+      # can fill them all with padding in one go.
+      layer_chars = list(observation.layers)
+      cropped_layers = np.zeros(
+          (len(layer_chars), crop_rows, crop_cols), dtype=bool)
+      pad_layers = np.array(
+          [char == self._pad_char for char in layer_chars],
+          dtype=bool).reshape(-1, 1, 1)
+      cropped = (
+          rendering.Observation(
+              board=np.zeros((crop_rows, crop_cols),
+                             dtype=observation.board.dtype),
+              layers={char: cropped_layers[i]
+                      for i, char in enumerate(layer_chars)}),
+          cropped_layers, pad_layers)
+
+    self._cropped_pool[key] = cropped
+    while len(self._cropped_pool) > _CROPPED_POOL_SIZE:
+      self._cropped_pool.popitem(last=False)
+
+    self._cropped, self._cropped_layers, self._pad_layers = cropped
+    # We don't know where the padding is in this observation.
+    self._crop_geometry = None
+
+
+class _LazyLayers(collections_abc.Mapping):
+  """Layers for a cropped `Observation`, computed from its board on demand.
+
+  This read-only mapping stands in for the `layers` dict of an `Observation`
+  cropped by an `ObservationCropper` with `lazy_layers`. The layer for each
+  character is only computed (as `board == ord(character)`) the first time
+  it's looked up, which matches the layers that the engine renders when it has
+  occlusion in its layers.
+  """
 
-    return self._cropped
+  def __init__(self, board, characters):
+    """Construct a `_LazyLayers`.
+
+    Args:
+      board: the cropped board to derive layers from.
+      characters: a collection of all the characters that have layers.
+    """
+    self._board = board
+    self._characters = characters
+    self._layers = {}
+
+  def __getitem__(self, character):
+    try:
+      return self._layers[character]
+    except KeyError:
+      if character not in self._characters: raise
+      layer = self._layers[character] = np.equal(self._board, ord(character))
+      return layer
+
+  def __iter__(self):
+    return iter(self._characters)
+
+  def __len__(self):
+    return len(self._characters)
 
 
 class FixedCropper(ObservationCropper):
   """A cropper that cuts a fixed subwindow from an `Observation`."""
 
-  def __init__(self, top_left_corner, rows, cols, pad_char=None):
+  def __init__(self, top_left_corner, rows, cols, pad_char=None,
+               view_ok=False, lazy_layers=False):
     """Initialise a `FixedCropper`.
 
     A `FixedCropper` crops out a fixed subwindow of the observation.
@@ -243,12 +412,27 @@ class FixedCropper(ObservationCropper):
           beyond the bounds of `observation`, or None if the cropping window
           will always remain in bounds (in which case a `RuntimeError` is
           raised if it does not).
+      view_ok: if True, whenever the cropping window lies entirely inside the
+          observation, `crop` returns an observation whose board and layers
+          are views into the original observation instead of copies. This
+          saves copying, but the cropped observation will change as soon as
+          the game engine renders its next observation, so only use this if
+          you're always done with a cropped observation by then.
+      lazy_layers: if True, `crop` copies only the board of the observation,
+          and each layer of the cropped observation is computed from the
+          cropped board when it's first looked up. This saves time if you only
+          use a few layers, but you must look them up before the next call to
+          `crop`, and the game engine must have been built with
+          `occlusion_in_layers=True` (the default), since otherwise layers
+          aren't determined by the board.
     """
     super(FixedCropper, self).__init__()
     self._top_row, self._left_col = top_left_corner
     self._rows = rows
     self._cols = cols
     self._pad_char = pad_char
+    self._view_ok = view_ok
+    self._lazy_layers = lazy_layers
     self._bottom_row_exclusive = self._top_row + self._rows
     self._right_col_exclusive = self._left_col + self._cols
 
@@ -272,7 +456,8 @@ class ScrollingCropper(ObservationCropper):
   """A cropper that scrolls to track moving game entities."""
 
   def __init__(self, rows, cols, to_track, pad_char=None,
-               scroll_margins=(2, 3), initial_offset=None, saccade=True):
+               scroll_margins=(2, 3), initial_offset=None, saccade=True,
+               view_ok=False, lazy_layers=False):
     """Initialise a `ScrollingCropper`.
 
     A `ScrollingCropper` does its best to slide fixed-size cropping windows
@@ -328,6 +513,13 @@ class ScrollingCropper(ObservationCropper):
           appear and disappear or change size. Also, see note on interactions
           with `initial_offset` and `scroll_margins` in the documentation for
           `scroll_margins`.
+      view_ok: if True, whenever the scrolling window lies entirely inside the
+          observation, `crop` returns an observation whose board and layers
+          are views into the original observation instead of copies. See
+          `FixedCropper` for the caveats.
+      lazy_layers: if True, `crop` copies only the board of the observation,
+          computing layers from the cropped board on demand. See `FixedCropper`
+          for the caveats.
 
     Raises:
       ValueError: some input arguments are misconfigured; scroll margins
@@ -339,6 +531,8 @@ class ScrollingCropper(ObservationCropper):
     self._cols = cols
     self._to_track = copy.copy(to_track)
     self._pad_char = pad_char
+    self._view_ok = view_ok
+    self._lazy_layers = lazy_layers
 
     if ((scroll_margins[0] is None and (rows % 2 == 0)) or
         (scroll_margins[1] is None and (cols % 2 == 0))):
@@ -364,6 +558,9 @@ class ScrollingCropper(ObservationCropper):
     # The location of the top-left corner of the scrolling window is
     # uninitialised at first.
     self._corner = None
+    # (entity, Sprite or Drape, whether it's a Sprite) for each entity in
+    # self._to_track, looked up by _centroid_to_track.
+    self._track_handles = None
 
   def set_engine(self, engine):
     """Overrides `set_engine` to do checks and an internal reset.
@@ -387,8 +584,9 @@ class ScrollingCropper(ObservationCropper):
               'observations in any dimension (in this case, {})'.format(
                   (self._rows, self._cols),
                   (self._engine.rows, self._engine.cols)))
-      # Force crop to reinitialise the window.
+      # Force crop to reinitialise the window and look up what to track.
       self._corner = None
+      self._track_handles = None
 
   def crop(self, observation):
     # Identify the location we should track.
@@ -402,6 +600,14 @@ class ScrollingCropper(ObservationCropper):
                                   self._cols // 2 + init_col))
 
     # Otherwise, if there's something to track, update the window's location.
+    # With JIT compilation, all of the logic below happens in a single call.
+    elif centroid is not None and _jit.ENABLED:
+      self._corner = _scroll_corner(
+          centroid[0], centroid[1], self._corner[0], self._corner[1],
+          self._scroll_margins[0], self._scroll_margins[1],
+          self._rows, self._cols, self._engine.rows, self._engine.cols,
+          self._pad_char is None, self._saccade)
+
     elif centroid is not None:
       # The trackable thing is visible inside the window (or just outside if
       # we have a 0 margin). Smoothly pan if needed to keep it in view.
@@ -550,49 +756,182 @@ class ScrollingCropper(ObservationCropper):
     Returns:
       either a 2-tuple `(row, col)` centroid to track, or None if the method
       could find no trackable centroid.
+
+    Raises:
+      RuntimeError: an entity in `to_track` corresponds to no game entity.
     """
+    # The first time we need them after set_engine, look up all the Sprites and
+    # Drapes we could track, noting which ones are Sprites. (Engine.things makes
+    # a new dict each time, so we don't want to do this on every frame.)
+    if self._track_handles is None:
+      things = self._engine.things
+      self._track_handles = [
+          (entity, things.get(entity), hasattr(things.get(entity), 'position'))
+          for entity in self._to_track]
+
     # We search in the priority ordering specified by self._to_track.
-    for entity in self._to_track:
-      centroid = self._centroid(entity)
+    for entity, sprite_or_drape, is_sprite in self._track_handles:
+      if sprite_or_drape is None:
+        raise RuntimeError(
+            'ScrollingCropper was told to track a nonexistent game entity '
+            '{!r}.'.format(entity))
+      centroid = self._centroid(sprite_or_drape, is_sprite)
       if centroid is not None: return centroid
     return None  # Can't find a centroid for anything we want to track!
 
-  def _centroid(self, entity):
+  def _centroid(self, sprite_or_drape, is_sprite):
     """Obtain the central location of a `Sprite` or `Drape`.
 
     This method works by inspecting `Sprite`s and `Drape`s within the game
     engine and not via analysing observations.
 
     Args:
-      entity: ASCII character designating the game entity whose centroid we
-          should attempt to find.
+      sprite_or_drape: the `Sprite` or `Drape` whose centroid we should attempt
+          to find.
+      is_sprite: whether `sprite_or_drape` is a `Sprite`.
 
     Returns:
-      either a 2-tuple `(row, col)` centroid for `entity`, or None if the game
-      entity has no centroid (if a sprite, it's not visible; if a drape, the
-      drape's entire curtain is False).
-
-    Raises:
-      RuntimeError: `entity` corresponds to no game entity.
+      either a 2-tuple `(row, col)` centroid for `sprite_or_drape`, or None if
+      the game entity has no centroid (if a sprite, it's not visible; if a
+      drape, the drape's entire curtain is False).
     """
-    # Obtain the item we're trying to track.
-    try:
-      sprite_or_drape = self._engine.things[entity]
-    except KeyError:
-      raise RuntimeError(
-          'ScrollingCropper was told to track a nonexistent game entity '
-          '{!r}.'.format(entity))
-
-    # Hope it's a Sprite and try to get its position. An invisible sprite has
-    # no position at all.
-    try:
-      if not sprite_or_drape.visible: return None
-      return tuple(sprite_or_drape.position)
-    except AttributeError:
-      pass
+    # If it's a Sprite, get its position. An invisible sprite has no position at
+    # all. (Positions are immutable namedtuples, so there's no need to copy
+    # them.)
+    if is_sprite:
+      return sprite_or_drape.position if sprite_or_drape.visible else None
 
     # If here, it's a Drape, not a Sprite. Compute the centroid of its
     # curtain and return that. An empty Drape has no centroid.
     curtain = sprite_or_drape.curtain
-    if not curtain.any(): return None
-    return tuple(int(np.median(dim)) for dim in curtain.nonzero())
+    if _jit.ENABLED:
+      centroid = _curtain_centroid(curtain)
+      return None if centroid[0] < 0 else centroid
+    # The centroid is the median of the row (column) indices of all of the True
+    # elements in the curtain, rounded down. Rather than collecting all of those
+    # indices and sorting them, we count how many True elements there are in
+    # each row (column), and find the indices in the middle of the cumulative
+    # counts.
+    row_counts = np.count_nonzero(curtain, axis=1)
+    total = row_counts.sum()
+    if not total: return None
+    middle = ((total - 1) // 2, total // 2)  # Same if total is odd.
+    return tuple(
+        int(np.searchsorted(np.cumsum(counts), middle, side='right').sum()) // 2
+        for counts in (row_counts, np.count_nonzero(curtain, axis=0)))
+
+
+@_jit.njit
+def _scroll_corner(crow, ccol, wrow, wcol, mrow, mcol, rows, cols,
+                   board_rows, board_cols, keep_on_board, saccade):
+  """Compiled scrolling window update for `ScrollingCropper.crop`.
+
+  Does the same work as the `_can_pan_to`, `_pan_to`, `_initialise`, and
+  `_rectify` calls that `ScrollingCropper.crop` makes when it has a centroid to
+  track and `_jit.ENABLED` is False, but all on scalars in a single call.
+
+  Args:
+    crow: row of the centroid to track.
+    ccol: column of the centroid to track.
+    wrow: current top row of the scrolling window.
+    wcol: current left column of the scrolling window.
+    mrow: scroll margin for rows.
+    mcol: scroll margin for columns.
+    rows: height of the scrolling window.
+    cols: width of the scrolling window.
+    board_rows: height of the game board.
+    board_cols: width of the game board.
+    keep_on_board: whether the window must stay inside the game board, i.e.
+        whether the `ScrollingCropper` has no pad character.
+    saccade: whether the window may jump to centre a faraway centroid.
+
+  Returns:
+    the new `(row, col)` top-left corner of the scrolling window.
+  """
+  # See ScrollingCropper._can_pan_to.
+  can_vert = (mrow - 1) <= (crow - wrow) <= (rows - mrow)
+  can_horiz = (mcol - 1) <= (ccol - wcol) <= (cols - mcol)
+  if keep_on_board:
+    if not can_vert:
+      if wrow <= 0:
+        can_vert = crow <= mrow
+      elif wrow >= (board_rows - rows):
+        can_vert = crow >= (wrow + rows - mrow)
+    elif not can_horiz:
+      if wcol <= 0:
+        can_horiz = ccol <= mcol
+      elif wcol >= (board_cols - cols):
+        can_horiz = ccol >= (wcol + cols - mcol)
+
+  if can_vert and can_horiz:
+    # See ScrollingCropper._pan_to.
+    drow = min(0, crow - wrow - mrow)
+    dcol = min(0, ccol - wcol - mcol)
+    if drow == 0: drow += max(0, crow - wrow - rows + mrow + 1)
+    if dcol == 0: dcol += max(0, ccol - wcol - cols + mcol + 1)
+    wrow += drow
+    wcol += dcol
+  elif saccade:
+    # See ScrollingCropper._initialise.
+    wrow = crow - rows // 2
+    wcol = ccol - cols // 2
+  else:
+    return wrow, wcol
+
+  # See ScrollingCropper._rectify.
+  if keep_on_board:
+    wrow = max(0, wrow) - max(0, wrow + rows - board_rows)
+    wcol = max(0, wcol) - max(0, wcol + cols - board_cols)
+  return wrow, wcol
+
+
+@_jit.njit
+def _curtain_centroid(curtain):
+  """Compiled centroid of the True elements of a `Drape`'s curtain.
+
+  Computes the same `(row, col)` centroid as `ScrollingCropper._centroid` does
+  when `_jit.ENABLED` is False---the medians of the row and column indices of
+  all True elements, rounded down---but in a single pass over the curtain, and
+  without collecting all of those indices first.
+
+  Args:
+    curtain: 2-D boolean `Drape` curtain.
+
+  Returns:
+    a 2-tuple `(row, col)` centroid, or `(-1, -1)` if `curtain` is all False.
+  """
+  rows, cols = curtain.shape
+  row_counts = np.zeros(rows, dtype=np.int64)
+  col_counts = np.zeros(cols, dtype=np.int64)
+  for row in range(rows):
+    for col in range(cols):
+      if curtain[row, col]:
+        row_counts[row] += 1
+        col_counts[col] += 1
+  total = row_counts.sum()
+  if total == 0: return -1, -1
+  return _median_index(row_counts, total), _median_index(col_counts, total)
+
+
+@_jit.njit
+def _median_index(counts, total):
+  """Median of a sorted list in which each index `i` appears `counts[i]` times.
+
+  Args:
+    counts: 1-D array of non-negative counts.
+    total: the sum of `counts`; must be positive.
+
+  Returns:
+    the median of the list, rounded down if it falls between two indices.
+  """
+  # The median is the mean of the list's elements at these two positions, which
+  # are the same position if the list has an odd length.
+  low = (total - 1) // 2
+  high = total // 2
+  low_index = -1
+  seen = 0
+  for index in range(len(counts)):
+    seen += counts[index]
+    if low_index < 0 and seen > low: low_index = index
+    if seen > high: return (low_index + index) // 2
+  return low_index
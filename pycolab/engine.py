@@ -212,6 +212,9 @@ class Engine(object):
     self._cols = cols
     self._occlusion_in_layers = occlusion_in_layers
 
+    # The game board dimensions, for the benefit of all Sprites.
+    self._corner = things.Sprite.Position(rows, cols)
+
     # This game's Plot object
     self._the_plot = plot.Plot()
 
@@ -223,13 +226,24 @@ class Engine(object):
     # This game's Backdrop object.
     self._backdrop = None
 
+    # All characters claimed so far by the Backdrop, Sprites, and Drapes.
+    self._claimed_chars = set()
+
     # This game's collection of Sprites and Drapes. The ordering of this dict
     # is the game's z-order, from back to front.
     self._sprites_and_drapes = collections.OrderedDict()
 
+    # Once the game is underway, a tuple mirroring the z-order above; see
+    # _cache_z_order().
+    self._z_order_entities = None
+
+    # Once the game is underway, whether the Backdrop overrides the default (and
+    # do-nothing) Backdrop.update() method; see its_showtime().
+    self._backdrop_updates = None
+
     # The collection of update groups. Before the its_showtime call, this is a
     # dict keyed by update group name, whose values are lists of Sprites and
-    # Drapes in the update group. After the call, this becomes a dict-like list
+    # Drapes in the update group. After the call, this becomes a dict-like tuple
     # of tuples that freezes the ordering implied by the update-group keys.
     self._update_groups = collections.defaultdict(list)
 
@@ -274,9 +288,8 @@ class Engine(object):
       ValueError: if `characters` are not ASCII characters.
     """
     self._runtime_error_if_called_during_showtime('set_backdrop')
-    return self.set_prefilled_backdrop(
-        characters, np.zeros((self._rows, self._cols), dtype=np.uint8),
-        backdrop_class, *args, **kwargs)
+    return self._set_backdrop_impl(
+        characters, None, backdrop_class, *args, **kwargs)
 
   def set_prefilled_backdrop(
       self, characters, prefill, backdrop_class, *args, **kwargs):
@@ -311,10 +324,18 @@ class Engine(object):
       RuntimeError: if gameplay has already begun, if `set_backdrop` has already
           been called for this engine, or if any characters in `characters` has
           already been claimed by a preceding call to the `add` method.
-      TypeError: if `backdrop_class` is not a `Backdrop` subclass.
-      ValueError: if `characters` are not ASCII characters.
+      TypeError: if `backdrop_class` is not a `Backdrop` subclass, or if
+          `prefill` is not a `uint8` array.
+      ValueError: if `characters` are not ASCII characters, or if `prefill` is
+          not the same shape as the game board.
     """
     self._runtime_error_if_called_during_showtime('set_prefilled_backdrop')
+    return self._set_backdrop_impl(
+        characters, prefill, backdrop_class, *args, **kwargs)
+
+  def _set_backdrop_impl(
+      self, characters, prefill, backdrop_class, *args, **kwargs):
+    """Implement `set_prefilled_backdrop`; a None `prefill` means all zeros."""
     self._value_error_if_characters_are_bad(characters)
     self._runtime_error_if_characters_claimed_already(characters)
     if self._backdrop:
@@ -325,14 +346,12 @@ class Engine(object):
                       'either be a Backdrop class or one of its subclasses.')
 
     # Construct a new curtain and palette for the Backdrop.
-    curtain = np.zeros((self._rows, self._cols), dtype=np.uint8)
+    curtain = self._curtain_from_prefill(prefill, np.uint8)
     palette = Palette(characters)
 
-    # Fill the curtain with the prefill data.
-    np.copyto(dst=curtain, src=prefill, casting='equiv')
-
     # Build and set the Backdrop.
     self._backdrop = backdrop_class(curtain, palette, *args, **kwargs)
+    self._claimed_chars.update(palette)
 
     return self._backdrop
 
@@ -364,9 +383,7 @@ class Engine(object):
       ValueError: if `character` is not a single ASCII character.
     """
     self._runtime_error_if_called_during_showtime('add_drape')
-    return self.add_prefilled_drape(
-        character, np.zeros((self._rows, self._cols), dtype=np.bool_),
-        drape_class, *args, **kwargs)
+    return self._add_drape_impl(character, None, drape_class, *args, **kwargs)
 
   def add_prefilled_drape(
       self, character, prefill, drape_class, *args, **kwargs):
@@ -393,10 +410,17 @@ class Engine(object):
       RuntimeError: if gameplay has already begun, or if any characters in
           `characters` has already been claimed by a preceding call to the
           `set_backdrop` or `add` methods.
-      TypeError: if `drape_class` is not a `Drape` subclass.
-      ValueError: if `character` is not a single ASCII character.
+      TypeError: if `drape_class` is not a `Drape` subclass, or if `prefill` is
+          not a `bool_` array.
+      ValueError: if `character` is not a single ASCII character, or if
+          `prefill` is not the same shape as the game board.
     """
     self._runtime_error_if_called_during_showtime('add_prefilled_drape')
+    return self._add_drape_impl(
+        character, prefill, drape_class, *args, **kwargs)
+
+  def _add_drape_impl(self, character, prefill, drape_class, *args, **kwargs):
+    """Implement `add_prefilled_drape`; a None `prefill` means all False."""
     self._value_error_if_characters_are_bad(character, mandatory_len=1)
     self._runtime_error_if_characters_claimed_already(character)
     if not issubclass(drape_class, things.Drape):
@@ -404,14 +428,12 @@ class Engine(object):
                       'subclass of Drape')
 
     # Construct a new curtain for the drape.
-    curtain = np.zeros((self._rows, self._cols), dtype=np.bool_)
-
-    # Fill the curtain with the prefill data.
-    np.copyto(dst=curtain, src=prefill, casting='equiv')
+    curtain = self._curtain_from_prefill(prefill, np.bool_)
 
     # Build and save the drape.
     drape = drape_class(curtain, character, *args, **kwargs)
     self._sprites_and_drapes[character] = drape
+    self._claimed_chars.add(character)
     self._update_groups[self._current_update_group].append(drape)
 
     return drape
@@ -451,20 +473,18 @@ class Engine(object):
     if not issubclass(sprite_class, things.Sprite):
       raise TypeError('sprite_class arguments to Engine.add_sprite must be a '
                       'subclass of Sprite')
-    if (not 0 <= position[0] < self._rows or
-        not 0 <= position[1] < self._cols):
+    row, col = position
+    if not (0 <= row < self._rows and 0 <= col < self._cols):
       raise ValueError('Position {} does not fall inside a {}x{} game board.'
                        ''.format(position, self._rows, self._cols))
 
-    # Construct the game board dimensions for the benefit of this sprite.
-    corner = things.Sprite.Position(self._rows, self._cols)
-
     # Construct a new position for the sprite.
-    position = things.Sprite.Position(*position)
+    position = things.Sprite.Position(row, col)
 
-    # Build and save the drape.
-    sprite = sprite_class(corner, position, character, *args, **kwargs)
+    # Build and save the sprite. All sprites share the same (immutable) corner.
+    sprite = sprite_class(self._corner, position, character, *args, **kwargs)
     self._sprites_and_drapes[character] = sprite
+    self._claimed_chars.add(character)
     self._update_groups[self._current_update_group].append(sprite)
 
     return sprite
@@ -548,26 +568,39 @@ class Engine(object):
           `Backdrop` class has ever been provided to the Engine.
     """
     self._runtime_error_if_called_during_showtime('its_showtime')
+    if self._backdrop is None:
+      raise RuntimeError('its_showtime() was called before a Backdrop was '
+                         'supplied to this Engine via set_backdrop() or '
+                         'set_prefilled_backdrop().')
 
     # It's showtime!
     self._showtime = True
 
     # Now that all the Sprites and Drapes are known, convert the update groups
     # to a more efficient structure.
-    self._update_groups = [(key, self._update_groups[key])
-                           for key in sorted(self._update_groups.keys())]
+    self._update_groups = tuple((key, tuple(self._update_groups[key]))
+                                for key in sorted(self._update_groups.keys()))
 
     # And, I guess we promised to do this:
     self._current_update_group = None
 
-    # Construct the game's observation renderer.
-    chars = set(self._sprites_and_drapes.keys()).union(self._backdrop.palette)
+    # Likewise for the z-order, which _render() walks several times per frame.
+    self._cache_z_order()
+
+    # Most games use a Backdrop that never changes, whose update() method is the
+    # do-nothing default. There's no need to call that method on every frame.
+    self._backdrop_updates = (
+        six.get_unbound_function(type(self._backdrop).update) is not
+        six.get_unbound_function(things.Backdrop.update))
+
+    # Construct the game's observation renderer, with a layer for every
+    # character claimed by the Backdrop, Sprites, and Drapes.
     if self._occlusion_in_layers:
       self._renderer = rendering.BaseObservationRenderer(
-          self._rows, self._cols, chars)
+          self._rows, self._cols, self._claimed_chars)
     else:
       self._renderer = rendering.BaseUnoccludedObservationRenderer(
-          self._rows, self._cols, chars)
+          self._rows, self._cols, self._claimed_chars)
 
     # Render a "pre-initial" board rendering from all of the data in the
     # Engine's Backdrop, Sprites, and Drapes. This rendering is only used as
@@ -654,6 +687,11 @@ class Engine(object):
   def game_over(self):
     return self._game_over
 
+  @property
+  def occlusion_in_layers(self):
+    """Whether observation `layers` show occlusion; see `__init__`."""
+    return self._occlusion_in_layers
+
   @property
   def z_order(self):
     """Obtain a copy of the game's current z-order."""
@@ -691,10 +729,41 @@ class Engine(object):
       A dict mapping ASCII characters to the `Sprite` and `Drape` entities that
           paint those characters onto the game board.
     """
-    return {k: t for k, t in six.iteritems(self._sprites_and_drapes)}
+    return dict(self._sprites_and_drapes)
 
   ### Private helpers ###
 
+  def _curtain_from_prefill(self, prefill, dtype):
+    """Make a new curtain for a `Backdrop` or `Drape`.
+
+    Args:
+      prefill: a 2-D array (or nested sequence) with the same dimensions as
+          this `Engine`, whose contents are copied into the new curtain; or
+          None, for a curtain full of zeros.
+      dtype: the curtain's numpy dtype; `prefill` must have an equivalent one.
+
+    Returns:
+      A new C-contiguous `dtype` array that doesn't share memory with
+      `prefill`.
+
+    Raises:
+      TypeError: `prefill`'s dtype is not equivalent to `dtype`.
+      ValueError: `prefill` is not the same shape as the game board.
+    """
+    if prefill is None:
+      return np.zeros((self._rows, self._cols), dtype=dtype)
+
+    prefill = np.asarray(prefill)
+    if not np.can_cast(prefill.dtype, dtype, casting='equiv'):
+      raise TypeError('Cannot use an array of dtype {} to prefill a curtain of '
+                      'dtype {}'.format(prefill.dtype, np.dtype(dtype)))
+    if prefill.shape != (self._rows, self._cols):
+      raise ValueError('Prefill arrays must have the same shape as the game '
+                       'board, {}, but this one has shape {}'.format(
+                           (self._rows, self._cols), prefill.shape))
+    # One allocation, one copy: no need to zero out memory we'll overwrite.
+    return np.array(prefill, dtype=dtype, copy=True, order='C')
+
   def _update_and_render(self, actions):
     """Perform all game entity updates and render the next observation.
 
@@ -712,24 +781,30 @@ class Engine(object):
     assert self._board, (
         '_update_and_render() called without a prior rendering of the board')
 
+    # None of these change identity during the updates, so we look them up
+    # just once. (The board and layers are only repainted between groups.)
+    the_plot = self._the_plot
+    backdrop = self._backdrop
+    all_things = self._sprites_and_drapes
+
     # A new frame begins!
-    self._the_plot.frame += 1
+    the_plot.frame += 1
 
     # We start with the backdrop; it doesn't really belong to an update group,
     # or it belongs to the first update group, depending on how you look at it.
-    self._the_plot.update_group = None
-    self._backdrop.update(actions,
-                          self._board.board, self._board.layers,
-                          self._sprites_and_drapes, self._the_plot)
+    # (Unless it's a Backdrop that never changes; see its_showtime().)
+    the_plot.update_group = None
+    if self._backdrop_updates:
+      board, layers = self._board
+      backdrop.update(actions, board, layers, all_things, the_plot)
 
     # Now we proceed through each of the update groups in the prescribed order.
     for update_group, entities in self._update_groups:
       # First, consult each item in this update group for updates.
-      self._the_plot.update_group = update_group
+      the_plot.update_group = update_group
+      board, layers = self._board
       for entity in entities:
-        entity.update(actions,
-                      self._board.board, self._board.layers,
-                      self._backdrop, self._sprites_and_drapes, self._the_plot)
+        entity.update(actions, board, layers, backdrop, all_things, the_plot)
 
       # Next, repaint the board to reflect the updates from this update group.
       self._render()
@@ -746,18 +821,36 @@ class Engine(object):
     first, then the `Sprite`s and `Drape`s according to the z-order (the order
     in which they appear in `self._sprites_and_drapes`
     """
-    self._renderer.clear()
+    # The Backdrop covers every cell of the board (and, for the unoccluded
+    # renderer, sets every layer too), so there's no need to clear() first.
     self._renderer.paint_all_of(self._backdrop.curtain)
-    for character, entity in six.iteritems(self._sprites_and_drapes):
-      # By now we should have checked fairly carefully that all entities in
-      # _sprites_and_drapes are Sprites or Drapes.
-      if isinstance(entity, things.Sprite) and entity.visible:
-        self._renderer.paint_sprite(character, entity.position)
-      elif isinstance(entity, things.Drape):
-        self._renderer.paint_drape(character, entity.curtain)
+    # Sprites each paint a single cell, so we paint them one by one: gathering
+    # their positions for one numpy scatter costs more than it saves until
+    # there are dozens of them. We do skip the method lookups in the loop.
+    paint_sprite = self._renderer.paint_sprite
+    paint_drape = self._renderer.paint_drape
+    for character, entity, is_sprite in self._z_order_entities:
+      if is_sprite:
+        if entity.visible:
+          paint_sprite(character, entity.position)
+      else:
+        paint_drape(character, entity.curtain)
     # Done with all the layers; render the board!
     self._board = self._renderer.render()
 
+  def _cache_z_order(self):
+    """Cache the z-order as a tuple for `_render()` to walk.
+
+    Each element of `self._z_order_entities` is a `(character, entity,
+    is_sprite)` tuple, in the same order as `self._sprites_and_drapes`. By now
+    we should have checked fairly carefully that all entities in
+    `_sprites_and_drapes` are Sprites or Drapes, so `is_sprite` is False only
+    for Drapes.
+    """
+    self._z_order_entities = tuple(
+        (character, entity, isinstance(entity, things.Sprite))
+        for character, entity in six.iteritems(self._sprites_and_drapes))
+
   def _apply_and_clear_plot(self):
     """Apply directives to this `Engine` found in its `Plot` object.
 
@@ -791,48 +884,46 @@ class Engine(object):
     # So far, there's no reason to re-render the observation.
     should_rerender = False
 
-    # We don't expect to have too many z-order changes, so this slow, simple
-    # algorithm will probably do the trick.
-    for move_this, in_front_of_that in directives.z_updates:
+    # Apply all z-order changes to a list of characters, then rebuild the
+    # self._sprites_and_drapes dict just once at the end.
+    if directives.z_updates:
       # We have a z-order change, so re-rendering is necessary.
       should_rerender = True
+      sprites_and_drapes = self._sprites_and_drapes
+      z_order = list(sprites_and_drapes.keys())
 
-      # Make sure that the characters in the z-order change directive correspond
-      # to actual `Sprite`s and `Drape`s.
-      if move_this not in self._sprites_and_drapes:
-        raise RuntimeError(
-            'A z-order change directive said to move a Sprite or Drape '
-            'corresponding to character {}, but no such Sprite or Drape '
-            'exists'.format(repr(move_this)))
-      if in_front_of_that is not None:
-        if in_front_of_that not in self._sprites_and_drapes:
+      for move_this, in_front_of_that in directives.z_updates:
+        # Make sure that the characters in the z-order change directive
+        # correspond to actual `Sprite`s and `Drape`s.
+        if move_this not in sprites_and_drapes:
           raise RuntimeError(
-              'A z-order change directive said to move a Sprite or Drape in '
-              'front of a Sprite or Drape corresponding to character {}, but '
-              'no such Sprite or Drape exists'.format(repr(in_front_of_that)))
-
-      # Each directive means replacing the entire self._sprites_and_drapes dict.
-      new_sprites_and_drapes = collections.OrderedDict()
-
-      # Retrieve the Sprite or Drape that we are directed to move.
-      moving_sprite_or_drape = self._sprites_and_drapes[move_this]
-
-      # This special case handles circumstances where a Sprite or Drape is moved
-      # all the way to the back of the z-order.
-      if in_front_of_that is None:
-        new_sprites_and_drapes[move_this] = moving_sprite_or_drape
-
-      # Copy all Sprites or Drapes into the new sprites_and_drapes OrderedDict,
-      # inserting the moving entity in front of the one it's meant to occulude.
-      for character, entity in six.iteritems(self._sprites_and_drapes):
-        if character == move_this: continue
-        new_sprites_and_drapes[character] = entity
-        if character == in_front_of_that:
-          new_sprites_and_drapes[move_this] = moving_sprite_or_drape
-
-      # Install the OrderedDict just made as the new z-order and catalogue
-      # of Sprites and Drapes.
-      self._sprites_and_drapes = new_sprites_and_drapes
+              'A z-order change directive said to move a Sprite or Drape '
+              'corresponding to character {}, but no such Sprite or Drape '
+              'exists'.format(repr(move_this)))
+        if in_front_of_that is not None:
+          if in_front_of_that not in sprites_and_drapes:
+            raise RuntimeError(
+                'A z-order change directive said to move a Sprite or Drape in '
+                'front of a Sprite or Drape corresponding to character {}, but '
+                'no such Sprite or Drape exists'.format(
+                    repr(in_front_of_that)))
+
+        # Moving something in front of itself changes nothing.
+        if move_this == in_front_of_that: continue
+
+        # Take the moving entity out of the z-order, then put it back in just
+        # in front of the one it's meant to occlude, or all the way at the back
+        # if it isn't meant to occlude anything.
+        z_order.remove(move_this)
+        z_order.insert(0 if in_front_of_that is None else
+                       z_order.index(in_front_of_that) + 1, move_this)
+
+      # Install the new z-order and catalogue of Sprites and Drapes, and
+      # refresh our cached copy of it.
+      self._sprites_and_drapes = collections.OrderedDict(
+          (character, sprites_and_drapes[character])
+          for character in z_order)
+      self._cache_z_order()
 
     # The Backdrop or one of the Sprites or Drapes may have directed the game
     # to end. Update our game-over flag.
@@ -854,6 +945,8 @@ class Engine(object):
                          'has been called'.format(method_name))
 
   def _runtime_error_if_characters_claimed_already(self, characters):
+    if self._claimed_chars.isdisjoint(characters): return
+    # Someone has claimed one of these characters; find out who.
     for char in characters:
       if self._backdrop and char in self._backdrop.palette:
         raise RuntimeError('Character {} is already being used by '
@@ -868,9 +961,13 @@ class Engine(object):
           '{}, a string of length {}, was used where a string of length {} was '
           'required'.format(repr(characters), len(characters), mandatory_len))
     for char in characters:
-      try:               # This test won't catch all non-ASCII characters; if
-        ord(char)        # someone uses a unicode string, it'll pass. But that's
-      except TypeError:  # hard to do by accident.
+      try:
+        code = ord(char)
+      except TypeError:
+        code = None
+      # The renderers store characters as uint8 ASCII values, so anything else
+      # (including non-ASCII unicode characters) has to be turned away here.
+      if code is None or code > 127:
         raise ValueError('Character {} is not an ASCII character'.format(char))
 
 
@@ -953,9 +1050,15 @@ class Palette(object):
       if len(char) != 1:
         raise ValueError('Palette constructor requires legal characters to be '
                          'actual single charaters. "{}" is not.'.format(char))
-    self._legal_characters = set(legal_characters)
+    self._set_legal_characters(legal_characters)
 
   def __getattr__(self, name):
+    # No character or alias is a longer name starting with an underscore, so
+    # these (e.g. special method probes from copy and pickle, or our own members
+    # before __setstate__ restores them) are turned away quickly.
+    if len(name) > 1 and name.startswith('_'):
+      raise AttributeError('{!r} object has no attribute {!r}'.format(
+          type(self).__name__, name))
     return self._actual_lookup(name, AttributeError)
 
   def __getitem__(self, key):
@@ -967,7 +1070,7 @@ class Palette(object):
     return self._legal_characters
 
   def __setstate__(self, state):
-    self._legal_characters = set(state)
+    self._set_legal_characters(state)
 
   def __contains__(self, key):
     # It is intentional, but probably not so important (as long as there are no
@@ -977,10 +1080,19 @@ class Palette(object):
   def __iter__(self):
     return iter(self._legal_characters)
 
+  def _set_legal_characters(self, legal_characters):
+    """Helper: set legal characters and precompute all lookup results."""
+    self._legal_characters = set(legal_characters)
+    # Map each legal character, and each alias for one, to its numeric value.
+    self._lookup = {char: ord(char) for char in self._legal_characters}
+    self._lookup.update((alias, ord(char))
+                        for alias, char in six.iteritems(self._ALIASES)
+                        if char in self._legal_characters)
+
   def _actual_lookup(self, key, error):
     """Helper: perform character validation and conversion to numeric value."""
-    if key in self._ALIASES: key = self._ALIASES[key]
-    if key in self._legal_characters: return ord(key)
+    value = self._lookup.get(key)
+    if value is not None: return value
     raise error(
         '{} is not a legal character in this Palette; legal characters '
         'are {}.'.format(key, list(self._legal_characters)))
@@ -36,13 +36,12 @@ from __future__ import print_function
 import curses
 import sys
 
+from pycolab import _jit
 from pycolab import ascii_art
 from pycolab import human_ui
 from pycolab import things as plab_things
 from pycolab.prefab_parts import sprites as prefab_sprites
 
-from six.moves import xrange  # pylint: disable=redefined-builtin
-
 
 LEVELS = [
     # Level 0: Entranceway.
@@ -99,6 +98,9 @@ LEVELS = [
     ]
 ]
 
+# LEVELS as uint8 arrays, parsed just once.
+LEVEL_BOARDS = [ascii_art.ascii_art_to_uint8_nparray(level) for level in LEVELS]
+
 FG_COLOURS = {
     'A': (999, 500, 0),    # Player wears an orange jumpsuit.
     'X': (200, 200, 999),  # Apertures are blue.
@@ -121,6 +123,28 @@ BG_COLOURS = {
 }
 
 
+def _beam_path(ply_y, ply_x, dx, dy):
+  """Index for the cells a blaster beam crosses, nearest to the player first.
+
+  Args:
+    ply_y: row of the player firing the blaster.
+    ply_x: column of the player firing the blaster.
+    dx: column direction of the shot: -1, 0, or 1.
+    dy: row direction of the shot: -1, 0, or 1. Exactly one of `dx` and `dy`
+        must be nonzero.
+
+  Returns:
+    A (row, column) index that selects a 1-D view of a board-sized array,
+    running from just beside the player to the edge of the board.
+  """
+  def away_from(start, direction):
+    if direction > 0: return slice(start + 1, None)
+    return slice(start - 1, None, -1) if start > 0 else slice(0)
+
+  if dx: return ply_y, away_from(ply_x, dx)
+  return away_from(ply_y, dy), ply_x
+
+
 class PlayerSprite(prefab_sprites.MazeWalker):
   """The player.
 
@@ -129,6 +153,12 @@ class PlayerSprite(prefab_sprites.MazeWalker):
   cranachan-consumption detection.
   """
 
+  # Motion for each action: go upward, downward, leftward, and rightward.
+  _MOTIONS = (prefab_sprites.MazeWalker._north,
+              prefab_sprites.MazeWalker._south,
+              prefab_sprites.MazeWalker._west,
+              prefab_sprites.MazeWalker._east)
+
   def __init__(self, corner, position, character):
     super(PlayerSprite, self).__init__(
         corner, position, character, impassable='#.@')
@@ -137,25 +167,22 @@ class PlayerSprite(prefab_sprites.MazeWalker):
     del backdrop  # Unused.
 
     # Handles basic movement, but not movement through apertures.
-    if actions == 0:  # go upward?
-      self._north(board, the_plot)
-    elif actions == 1:  # go downward?
-      self._south(board, the_plot)
-    elif actions == 2:  # go leftward?
-      self._west(board, the_plot)
-    elif actions == 3:  # go rightward?
-      self._east(board, the_plot)
+    if actions is not None and 0 <= actions < len(self._MOTIONS):
+      self._MOTIONS[actions](self, board, the_plot)
     elif actions == 9:  # quit?
       the_plot.terminate_episode()
 
+    # Where we ended up after any motion.
+    position = self.position
+
     # Did we walk onto exit? If so, we win!
-    if layers['C'][self.position]:
+    if layers['C'][position]:
       the_plot.add_reward(1)
       the_plot.terminate_episode()
 
     # Did we walk onto an aperture? If so, then teleport!
-    if layers['X'][self.position]:
-      destinations = [p for p in things['X'].apertures if p != self.position]
+    if layers['X'][position]:
+      destinations = [p for p in things['X'].apertures if p != position]
       if destinations: self._teleport(destinations[0])
 
 
@@ -166,55 +193,86 @@ class ApertureDrape(plab_things.Drape):
   teleport the player if necessary.
   """
 
+  # Column and row directions (dx, dy) of the blaster shot for each action:
+  # w - shoot up, a - shoot left, s - shoot down, d - shoot right.
+  _SHOTS = {5: (0, -1), 6: (-1, 0), 7: (0, 1), 8: (1, 0)}
+
   def __init__(self, curtain, character):
     super(ApertureDrape, self).__init__(curtain, character)
     self._apertures = [None, None]
+    # The apertures that exist so far, as returned by the `apertures` property.
+    # Rebuilt only when an aperture is made, not whenever someone asks.
+    self._existing_apertures = ()
 
   def update(self, actions, board, layers, backdrop, things, the_plot):
+    shot = self._SHOTS.get(actions)
+    if shot is None: return
+    dx, dy = shot
     ply_y, ply_x = things['A'].position
 
-    if actions == 5:  # w - shoot up?
-      dx, dy = 0, -1
-    elif actions == 6:  # a - shoot left?
-      dx, dy = -1, 0
-    elif actions == 7:  # s - shoot down?
-      dx, dy = 0, 1
-    elif actions == 8:  # d - shoot right?
-      dx, dy = 1, 0
+    # Look along the direction of the blaster shot for the first thing that
+    # stops the beam: a normal wall, an existing aperture, or a special wall.
+    # Only the last of these gets a new aperture.
+    if _jit.ENABLED:
+      step = _trace_beam(
+          layers['#'], layers['X'], layers['@'], ply_y, ply_x, dx, dy)
     else:
-      return
-
-    # Walk from the player along direction of blaster shot.
-    height, width = layers['A'].shape
-    for step in xrange(1, max(height, width)):
-      cur_x = ply_x + dx * step
-      cur_y = ply_y + dy * step
-      if cur_x < 0 or cur_x >= width or cur_y < 0 or cur_y >= height:
-        # Out of bounds, beam went nowhere.
-        break
-      elif layers['#'][cur_y, cur_x]:
-        # Hit normal wall before reaching a special wall.
-        break
-      elif layers['X'][cur_y, cur_x]:
-        # Hit an existing aperture.
-        break
-      if layers['@'][cur_y, cur_x]:
-        # Hit special wall, create an aperture.
-        self._apertures = self._apertures[1:] + [(cur_y, cur_x)]
-        self.curtain.fill(False)
-        for aperture in self.apertures:  # note use of None-filtered set.
-          self.curtain[aperture] = True
-        break
+      path = _beam_path(ply_y, ply_x, dx, dy)
+      special = layers['@'][path]
+      stops = layers['#'][path] | layers['X'][path] | special
+      step = int(stops.argmax()) if stops.any() else -1
+      if step >= 0 and not special[step]: step = -1
+    if step < 0: return
+
+    # Hit special wall, create an aperture, replacing the oldest one (if there
+    # are two already). Only those two cells of the curtain need to change.
+    cur_y, cur_x = ply_y + dy * (step + 1), ply_x + dx * (step + 1)
+    displaced = self._apertures[0]
+    if displaced is not None: self.curtain[displaced] = False
+    self.curtain[cur_y, cur_x] = True
+    self._apertures = self._apertures[1:] + [(cur_y, cur_x)]
+    self._existing_apertures = tuple(
+        a for a in self._apertures if a is not None)
 
   @property
   def apertures(self):
     """Returns locations of all apertures in the map."""
-    return tuple(a for a in self._apertures if a is not None)
+    return self._existing_apertures
+
+
+@_jit.njit
+def _trace_beam(walls, apertures, specials, ply_y, ply_x, dx, dy):
+  """Compiled counterpart to the blaster beam trace in `ApertureDrape`.
+
+  Args:
+    walls: layer for normal walls.
+    apertures: layer for existing apertures.
+    specials: layer for special walls.
+    ply_y: row of the player firing the blaster.
+    ply_x: column of the player firing the blaster.
+    dx: column direction of the shot: -1, 0, or 1.
+    dy: row direction of the shot: -1, 0, or 1.
+
+  Returns:
+    The position along the beam's path (0 for the cell beside the player) of
+    the special wall it hits, or -1 if it hits something else first or nothing
+    at all.
+  """
+  height, width = walls.shape
+  step = 0
+  cur_y, cur_x = ply_y + dy, ply_x + dx
+  while 0 <= cur_y < height and 0 <= cur_x < width:
+    if walls[cur_y, cur_x] or apertures[cur_y, cur_x]: return -1
+    if specials[cur_y, cur_x]: return step
+    step += 1
+    cur_y += dy
+    cur_x += dx
+  return -1
 
 
 def make_game(level_idx):
   return ascii_art.ascii_art_to_game(
-      art=LEVELS[level_idx],
+      art=LEVEL_BOARDS[level_idx],
       what_lies_beneath=' ',
       sprites={'A': PlayerSprite},
       drapes={'X': ApertureDrape},
@@ -100,26 +100,33 @@ class BallSprite(prefab_sprites.MazeWalker):
         corner, position, character, impassable='')
     # Choose one of the positions in the bottom row of the game board, and
     # compute the per-row X motion (fractional) we'd need to fall there.
-    self._dx = random.uniform(-2.499, 2.499) / (corner[0] - 1.0)
-    # At each game iteration, we add _dx to this accumulator. If the accumulator
-    # exceeds 0.5, we move one position right; if it goes below -0.5, we move
-    # one position left. We then bump the accumulator by -1 and 1 respectively.
-    self._x_accumulator = 0.0
+    offset = random.uniform(-2.499, 2.499)
+    self._dx = offset / (corner[0] - 1.0)
+    # We step along that line Bresenham-style, with integers only: per row, the
+    # ball's X motion is _dx_num / _dx_den cells, which is exactly the offset
+    # we chose divided by the number of rows. At each game iteration, we add
+    # _dx_num to this accumulator. If it exceeds half of _dx_den, we move one
+    # position right; if it goes below minus half of _dx_den, we move one
+    # position left. We then bump the accumulator by -_dx_den and _dx_den
+    # respectively. (Doubling the accumulator saves us halving _dx_den.)
+    self._dx_num, offset_den = offset.as_integer_ratio()
+    self._dx_den = (corner[0] - 1) * offset_den
+    self._x_accumulator = 0
 
   def update(self, actions, board, layers, backdrop, things, the_plot):
     del actions, layers, backdrop, things   # Unused.
 
     # The ball is always falling downward.
     self._south(board, the_plot)
-    self._x_accumulator += self._dx
+    self._x_accumulator += self._dx_num
 
     # Sometimes the ball shifts left or right.
-    if self._x_accumulator < -0.5:
+    if 2 * self._x_accumulator < -self._dx_den:
       self._west(board, the_plot)
-      self._x_accumulator += 1.0
-    elif self._x_accumulator > 0.5:
+      self._x_accumulator += self._dx_den
+    elif 2 * self._x_accumulator > self._dx_den:
       self._east(board, the_plot)
-      self._x_accumulator -= 1.0
+      self._x_accumulator -= self._dx_den
 
     # Log the motion information for review in e.g. game consoles.
     the_plot.log('Falling with horizontal velocity {}.\n'
@@ -0,0 +1,152 @@
+# Copyright 2017 the pycolab Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A batched, headless implementation of the classic chain-walk problem.
+
+This module implements the same game as `chain_walk.py`, but instead of
+building one pycolab `Engine` per episode, a `BatchChainWalk` steps `n`
+independent chain walks at once. All of the game state is held in a handful of
+small numpy arrays, so a single Python-level call to `step` serves the whole
+batch. This is handy for collecting lots of experience quickly, but since
+there's no `Engine`, there's no board to look at: observations are just the
+columns where each player is standing.
+
+For very large batches, the arrays can live on a GPU instead: just pass the
+`cupy` module (or any other module with a numpy-compatible interface) as the
+`xp` argument to the constructor, and supply actions as arrays from that module
+too.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import sys
+
+import numpy as np
+
+
+# The chain in `chain_walk.GAME_ART` is this long, and the player starts here.
+# (We don't import `chain_walk` itself, since it drags in curses.)
+_LENGTH = 22
+_START = 2
+
+# Column displacements for each action: walk leftward, walk rightward, stay put.
+_DELTA = np.array([-1, 1, 0], dtype=np.int32)
+
+
+class BatchChainWalk(object):
+  """`n` chain-walk games, played in lockstep.
+
+  The games follow the same rules as `chain_walk.py`: action 0 moves the player
+  leftward, action 1 moves it rightward, and action 2 does nothing. Reaching
+  the leftmost extreme of the chain earns a reward of 1; reaching the rightmost
+  extreme earns 100. Either way, the game terminates. Terminated games ignore
+  all subsequent actions until `reset` is called.
+  """
+
+  def __init__(self, n, length=None, xp=np):
+    """Construct a `BatchChainWalk`.
+
+    Args:
+      n: number of games to play simultaneously.
+      length: length of the chain. If None, the chain is as long as the one in
+          `chain_walk.GAME_ART`.
+      xp: the array module for all of this object's arrays; `numpy` by default,
+          but e.g. `cupy` works too.
+
+    Raises:
+      ValueError: `length` is too short to hold the player's starting position.
+    """
+    self._n = n
+    self._length = _LENGTH if length is None else length
+    if self._length < _START + 2:
+      raise ValueError('A BatchChainWalk needs a chain of length at least {}, '
+                       'not {}.'.format(_START + 2, self._length))
+
+    self._xp = xp
+    self._delta = xp.asarray(_DELTA)
+
+    self.pos = xp.empty(n, dtype=xp.int32)
+    self.done = xp.empty(n, dtype=xp.bool_)
+    # Rewards are written into the same array at every step.
+    self._rewards = xp.zeros(n, dtype=xp.float32)
+    self.reset()
+
+  def reset(self):
+    """Start all `n` games over again.
+
+    Returns:
+      The initial observation: a 1-D `int32` array of player columns.
+    """
+    self.pos.fill(_START)
+    self.done.fill(False)
+    return self.pos
+
+  def step(self, actions):
+    """Apply one action to each of the `n` games.
+
+    Args:
+      actions: a length-`n` integer array of actions in `[0, 2]`, from the same
+          array module as this object's arrays.
+
+    Returns:
+      A 3-tuple with the following members:
+        * A 1-D `int32` array of player columns.
+        * A 1-D `float32` array of rewards for the actions just taken.
+        * A 1-D boolean array indicating which games have terminated.
+
+      Callers should treat these arrays as read-only and should not keep
+      references to them between calls to `step`.
+    """
+    # Only games that are still underway may move.
+    self.pos += self._xp.where(self.done, 0, self._delta[actions])
+
+    # See which games are over, and what the players got for it.
+    left = (self.pos == 0) & ~self.done
+    right = (self.pos == self._length - 1) & ~self.done
+    self._rewards.fill(0.0)
+    self._rewards[left] += 1.0
+    self._rewards[right] += 100.0
+    self.done |= left | right
+
+    return self.pos, self._rewards, self.done
+
+  @property
+  def n(self):
+    return self._n
+
+  @property
+  def length(self):
+    return self._length
+
+
+def main(argv=()):
+  del argv  # Unused.
+
+  # Build a batch of chain-walk games.
+  games = BatchChainWalk(n=1024)
+
+  # Play them all with a uniformly random policy until they've all terminated.
+  returns = np.zeros(games.n, dtype=np.float64)
+  while not games.done.all():
+    _, rewards, _ = games.step(np.random.randint(0, 2, size=games.n))
+    returns += rewards
+
+  print('Mean return over {} random chain walks: {}'.format(
+      games.n, returns.mean()))
+
+
+if __name__ == '__main__':
+  main(sys.argv)
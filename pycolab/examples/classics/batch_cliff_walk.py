@@ -0,0 +1,181 @@
+# Copyright 2017 the pycolab Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A batched, headless implementation of the classic cliff-walk problem.
+
+This module implements the same game as `cliff_walk.py`, but instead of
+building one pycolab `Engine` per episode, a `BatchCliffWalk` steps `n`
+independent cliff walks at once. All of the game state is held in a handful of
+small numpy arrays, so a single Python-level call to `step` serves the whole
+batch. This is handy for collecting lots of experience quickly, but since
+there's no `Engine`, there's no board to look at: observations are just the
+row, column coordinates where each player is standing.
+
+For very large batches, the arrays can live on a GPU instead: just pass the
+`cupy` module (or any other module with a numpy-compatible interface) as the
+`xp` argument to the constructor, and supply actions as arrays from that module
+too.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import sys
+
+import numpy as np
+
+
+# The board in `cliff_walk.GAME_ART` has these dimensions. The player starts in
+# the bottom-left corner. (We don't import `cliff_walk` itself, since it drags
+# in curses.)
+_ROWS = 4
+_COLS = 12
+
+# Row and column displacements for each action: walk upward, walk downward,
+# walk leftward, walk rightward, and stay put. Actions beyond these are treated
+# like the last one.
+_DY = np.array([-1, 1, 0, 0, 0], dtype=np.int32)
+_DX = np.array([0, 0, -1, 1, 0], dtype=np.int32)
+
+
+class BatchCliffWalk(object):
+  """`n` cliff-walk games, played in lockstep.
+
+  The games follow the same rules as `cliff_walk.py`: actions 0, 1, 2, and 3
+  move the player up, down, left, and right respectively, but never off of the
+  board. Walking into any but the first and last columns of the bottom row
+  earns a reward of -100 and terminates the game; moving anywhere else earns a
+  reward of -1, and moving into the bottom right cell terminates the game, too.
+  All other actions are ignored and earn no reward. Terminated games ignore all
+  subsequent actions until `reset` is called.
+  """
+
+  def __init__(self, n, rows=None, cols=None, xp=np):
+    """Construct a `BatchCliffWalk`.
+
+    Args:
+      n: number of games to play simultaneously.
+      rows: height of the game board. If None, the board is as tall as the one
+          in `cliff_walk.GAME_ART`.
+      cols: width of the game board. If None, the board is as wide as the one
+          in `cliff_walk.GAME_ART`.
+      xp: the array module for all of this object's arrays; `numpy` by default,
+          but e.g. `cupy` works too.
+
+    Raises:
+      ValueError: the game board is too small to have a cliff.
+    """
+    self._n = n
+    self._rows = _ROWS if rows is None else rows
+    self._cols = _COLS if cols is None else cols
+    if self._rows < 2 or self._cols < 3:
+      raise ValueError('A BatchCliffWalk needs a board of at least 2x3 cells, '
+                       'not {}x{}.'.format(self._rows, self._cols))
+
+    self._xp = xp
+    self._dy = xp.asarray(_DY)
+    self._dx = xp.asarray(_DX)
+
+    # Player positions, one (row, col) pair per game.
+    self.pos = xp.empty((n, 2), dtype=xp.int32)
+    self.done = xp.empty(n, dtype=xp.bool_)
+    # Rewards are written into the same array at every step.
+    self._rewards = xp.zeros(n, dtype=xp.float32)
+    self.reset()
+
+  def reset(self):
+    """Start all `n` games over again.
+
+    Returns:
+      The initial observation: an `n`x2 `int32` array of player positions.
+    """
+    self.pos[:, 0] = self._rows - 1
+    self.pos[:, 1] = 0
+    self.done.fill(False)
+    return self.pos
+
+  def step(self, actions):
+    """Apply one action to each of the `n` games.
+
+    Args:
+      actions: a length-`n` integer array of actions, from the same array
+          module as this object's arrays.
+
+    Returns:
+      A 3-tuple with the following members:
+        * An `n`x2 `int32` array of player positions.
+        * A 1-D `float32` array of rewards for the actions just taken.
+        * A 1-D boolean array indicating which games have terminated.
+
+      Callers should treat these arrays as read-only and should not keep
+      references to them between calls to `step`.
+    """
+    # Only games that are still underway and received a motion action may move,
+    # and they receive a reward no matter where they end up. Any other action,
+    # negative ones included, is ignored, just as in cliff_walk.
+    xp = self._xp
+    moving = (actions >= 0) & (actions < len(_DY) - 1) & ~self.done
+    actions = xp.clip(actions, 0, len(_DY) - 1)
+
+    # Move all the players that are moving, but keep them on the board.
+    rows, cols = self.pos[:, 0], self.pos[:, 1]
+    rows += xp.where(moving, self._dy[actions], 0)
+    cols += xp.where(moving, self._dx[actions], 0)
+    xp.clip(rows, 0, self._rows - 1, out=rows)
+    xp.clip(cols, 0, self._cols - 1, out=cols)
+
+    # See what reward we get for moving where we moved.
+    on_bottom = rows == self._rows - 1
+    cliff = on_bottom & (0 < cols) & (cols < self._cols - 2)
+    self._rewards.fill(0.0)
+    self._rewards[moving] = -1.0
+    self._rewards[moving & cliff] = -100.0
+
+    # See which games are over.
+    self.done |= moving & on_bottom & (0 < cols)
+
+    return self.pos, self._rewards, self.done
+
+  @property
+  def n(self):
+    return self._n
+
+  @property
+  def rows(self):
+    return self._rows
+
+  @property
+  def cols(self):
+    return self._cols
+
+
+def main(argv=()):
+  del argv  # Unused.
+
+  # Build a batch of cliff-walk games.
+  games = BatchCliffWalk(n=1024)
+
+  # Play them all with a uniformly random policy until they've all terminated.
+  returns = np.zeros(games.n, dtype=np.float64)
+  while not games.done.all():
+    _, rewards, _ = games.step(np.random.randint(0, 4, size=games.n))
+    returns += rewards
+
+  print('Mean return over {} random cliff walks: {}'.format(
+      games.n, returns.mean()))
+
+
+if __name__ == '__main__':
+  main(sys.argv)
@@ -19,20 +19,27 @@ from __future__ import division
 from __future__ import print_function
 
 import curses
+import os
 import sys
 
 from pycolab import ascii_art
 from pycolab import human_ui
+from pycolab.examples import headless
 from pycolab.prefab_parts import sprites as prefab_sprites
 
 
 GAME_ART = ['..P...................']
 
 
+# The same diagram, converted once and for all to the numpy array that
+# `ascii_art_to_game` would otherwise have to derive for every new game.
+GAME_BOARD = ascii_art.ascii_art_to_uint8_nparray(GAME_ART)
+
+
 def make_game():
   """Builds and returns a chain-walk game."""
   return ascii_art.ascii_art_to_game(
-      GAME_ART, what_lies_beneath='.',
+      GAME_BOARD, what_lies_beneath='.',
       sprites={'P': PlayerSprite})
 
 
@@ -44,6 +51,11 @@ class PlayerSprite(prefab_sprites.MazeWalker):
   extreme it receives a large reward. The game terminates in either case.
   """
 
+  # Motion for each action: walk leftward, walk rightward. Any other action
+  # (e.g. the no-op that the CursesUi sends when the user is idle) is ignored.
+  _MOTIONS = (prefab_sprites.MazeWalker._west,
+              prefab_sprites.MazeWalker._east)
+
   def __init__(self, corner, position, character):
     """Inform superclass that we can go anywhere."""
     super(PlayerSprite, self).__init__(
@@ -53,10 +65,8 @@ class PlayerSprite(prefab_sprites.MazeWalker):
     del layers, backdrop, things   # Unused.
 
     # Apply motion commands.
-    if actions == 0:    # walk leftward?
-      self._west(board, the_plot)
-    elif actions == 1:  # walk rightward?
-      self._east(board, the_plot)
+    if actions is not None and 0 <= actions < len(self._MOTIONS):
+      self._MOTIONS[actions](self, board, the_plot)
 
     # See if the game is over.
     if self.position[1] == 0:
@@ -73,6 +83,11 @@ def main(argv=()):
   # Build a chain-walk game.
   game = make_game()
 
+  # Without a human to play, feed the game random actions instead.
+  if os.environ.get('PYCOLAB_HEADLESS'):
+    headless.play(game, headless.random_policy([0, 1]), verbose=True)
+    return
+
   # Make a CursesUi to play it with.
   ui = human_ui.CursesUi(
       keys_to_actions={curses.KEY_LEFT: 0, curses.KEY_RIGHT: 1, -1: 2},
@@ -19,10 +19,14 @@ from __future__ import division
 from __future__ import print_function
 
 import curses
+import os
 import sys
 
+import numpy as np
+
 from pycolab import ascii_art
 from pycolab import human_ui
+from pycolab.examples import headless
 from pycolab.prefab_parts import sprites as prefab_sprites
 
 
@@ -32,11 +36,75 @@ GAME_ART = ['............',
             'P...........']
 
 
-def make_game():
-  """Builds and returns a cliff-walk game."""
+# Pre-parsed copy of GAME_ART, so that make_game needn't re-parse it.
+GAME_BOARD = ascii_art.ascii_art_to_uint8_nparray(GAME_ART)
+
+
+def make_game(rows=None, cols=None, fast=False):
+  """Builds and returns a cliff-walk game.
+
+  Args:
+    rows: height of the game board. If None, the board is as tall as the one
+        in `GAME_ART`.
+    cols: width of the game board. If None, the board is as wide as the one in
+        `GAME_ART`.
+    fast: if True, the player is a `PlayerSpriteFast` instead of a
+        `PlayerSprite`. The game is the same either way.
+
+  Returns:
+    A cliff-walk game.
+
+  Raises:
+    ValueError: the game board is too small to have a cliff.
+  """
+  rows = GAME_BOARD.shape[0] if rows is None else rows
+  cols = GAME_BOARD.shape[1] if cols is None else cols
+  if rows < 2 or cols < 3:
+    raise ValueError('A cliff-walk game needs a board of at least 2x3 cells, '
+                     'not {}x{}.'.format(rows, cols))
+
+  # Use the pre-parsed board if we can; otherwise, build a board of the right
+  # size with the player in the bottom-left corner, just like GAME_ART.
+  if (rows, cols) == GAME_BOARD.shape:
+    art = GAME_BOARD
+  else:
+    art = ['.' * cols] * (rows - 1) + ['P' + '.' * (cols - 1)]
+
   return ascii_art.ascii_art_to_game(
-      GAME_ART, what_lies_beneath='.',
-      sprites={'P': PlayerSprite})
+      art, what_lies_beneath='.',
+      sprites={'P': PlayerSpriteFast if fast else PlayerSprite})
+
+
+# Cliff and terminal masks for every board size seen so far; see `_masks`.
+_MASKS_BY_SHAPE = {}
+
+
+def _masks(corner):
+  """Get the cliff and terminal masks for a board of size `corner`.
+
+  The cliff is all but the first and last columns of the bottom row; every
+  bottom-row cell but the first ends the game. Since a new `PlayerSprite` is
+  built for every episode, the masks are computed just once per board size and
+  shared thereafter, so they are made read-only.
+
+  Args:
+    corner: a (rows, cols) tuple: the size of the game board.
+
+  Returns:
+    A 2-tuple of read-only boolean arrays shaped like the board: the cliff mask
+    and the terminal mask.
+  """
+  corner = tuple(corner)
+  masks = _MASKS_BY_SHAPE.get(corner)
+  if masks is None:
+    rows, cols = corner
+    cliff = np.zeros(corner, dtype=np.bool_)
+    cliff[rows - 1, 1:cols - 2] = True
+    terminal = np.zeros(corner, dtype=np.bool_)
+    terminal[rows - 1, 1:] = True
+    cliff.flags.writeable = terminal.flags.writeable = False
+    masks = _MASKS_BY_SHAPE[corner] = (cliff, terminal)
+  return masks
 
 
 class PlayerSprite(prefab_sprites.MazeWalker):
@@ -48,23 +116,27 @@ class PlayerSprite(prefab_sprites.MazeWalker):
   reward of -1; moving into the bottom right cell terminates the episode.
   """
 
+  # Motion for each action: walk upward, downward, leftward, and rightward.
+  _MOTIONS = (prefab_sprites.MazeWalker._north,
+              prefab_sprites.MazeWalker._south,
+              prefab_sprites.MazeWalker._west,
+              prefab_sprites.MazeWalker._east)
+
   def __init__(self, corner, position, character):
     """Inform superclass that we can go anywhere, but not off the board."""
     super(PlayerSprite, self).__init__(
         corner, position, character, impassable='', confined_to_board=True)
 
+    # The cliff and the terminal cells never change, so all players on boards
+    # of the same size can share the same masks.
+    self._cliff, self._terminal = _masks(corner)
+
   def update(self, actions, board, layers, backdrop, things, the_plot):
     del layers, backdrop, things   # Unused.
 
     # Apply motion commands.
-    if actions == 0:    # walk upward?
-      self._north(board, the_plot)
-    elif actions == 1:  # walk downward?
-      self._south(board, the_plot)
-    elif actions == 2:  # walk leftward?
-      self._west(board, the_plot)
-    elif actions == 3:  # walk rightward?
-      self._east(board, the_plot)
+    if actions is not None and 0 <= actions < len(self._MOTIONS):
+      self._MOTIONS[actions](self, board, the_plot)
     else:
       # All other actions are ignored. Although humans using the CursesUi can
       # issue action 4 (no-op), agents should only have access to actions 0-3.
@@ -72,20 +144,64 @@ class PlayerSprite(prefab_sprites.MazeWalker):
       return
 
     # See what reward we get for moving where we moved.
-    if (self.position[0] == (self.corner[0] - 1) and
-        0 < self.position[1] < (self.corner[1] - 2)):
+    if self._cliff[self.position]:
       the_plot.add_reward(-100.0)  # Fell off the cliff.
     else:
       the_plot.add_reward(-1.0)
 
     # See if the game is over.
-    if self.position[0] == (self.corner[0] - 1) and 0 < self.position[1]:
+    if self._terminal[self.position]:
+      the_plot.terminate_episode()
+
+
+class PlayerSpriteFast(PlayerSprite):
+  """A `PlayerSprite` that skips `MazeWalker`'s general-purpose motion logic.
+
+  A cliff-walk player can go anywhere on the board and there is no scrolling,
+  so each of `MazeWalker`'s motion helpers boils down to adding a displacement
+  to the player's position and refusing moves that would leave the board. This
+  `Sprite` does just that, then updates its position with a single teleport.
+  It plays the game identically to `PlayerSprite`, only with less overhead,
+  which adds up when agents play many episodes headlessly.
+  """
+
+  # Row and column displacements for each action: walk upward, downward,
+  # leftward, and rightward.
+  _DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+  def update(self, actions, board, layers, backdrop, things, the_plot):
+    del board, layers, backdrop, things   # Unused.
+
+    # Apply motion commands, ignoring any that would take us off the board.
+    if actions is not None and 0 <= actions < len(self._DELTAS):
+      dy, dx = self._DELTAS[actions]
+      row, col = self.position
+      rows, cols = self._cliff.shape
+      if 0 <= row + dy < rows and 0 <= col + dx < cols:
+        self._teleport((row + dy, col + dx))
+    else:
+      return  # All other actions are ignored, just as for PlayerSprite.
+
+    # See what reward we get for moving where we moved.
+    if self._cliff[self.position]:
+      the_plot.add_reward(-100.0)  # Fell off the cliff.
+    else:
+      the_plot.add_reward(-1.0)
+
+    # See if the game is over.
+    if self._terminal[self.position]:
       the_plot.terminate_episode()
 
 
 def main(argv=()):
   del argv  # Unused.
 
+  # Without a human to play, feed a fast cliff-walk game random actions.
+  if os.environ.get('PYCOLAB_HEADLESS'):
+    headless.play(make_game(fast=True), headless.random_policy([0, 1, 2, 3]),
+                  verbose=True)
+    return
+
   # Build a cliff-walk game.
   game = make_game()
 
@@ -22,6 +22,7 @@ from __future__ import division
 from __future__ import print_function
 
 import curses
+import os
 
 import numpy as np
 
@@ -30,6 +31,7 @@ import sys
 from pycolab import ascii_art
 from pycolab import human_ui
 from pycolab import things as plab_things
+from pycolab.examples import headless
 from pycolab.prefab_parts import sprites as prefab_sprites
 
 
@@ -40,6 +42,10 @@ GAME_ART = ['===================================================',
             '===================================================']
 
 
+# GAME_ART as a uint8 array, parsed just once.
+GAME_BOARD = ascii_art.ascii_art_to_uint8_nparray(GAME_ART)
+
+
 COLOURS_FG = {'P': (0, 999, 0),       # The swimmer
               '=': (576, 255, 0),     # The river bank
               ' ': (0, 505, 999),     # Empty water
@@ -60,7 +66,7 @@ COLOURS_BG = {'.': (0, 505, 999),     # Waves on the water have the "water"
 def make_game():
   """Builds and returns a Fluvial Natation game."""
   return ascii_art.ascii_art_to_game(
-      GAME_ART, what_lies_beneath=' ',
+      GAME_BOARD, what_lies_beneath=' ',
       sprites={'P': PlayerSprite},
       backdrop=RiverBackdrop)
 
@@ -80,18 +86,23 @@ class PlayerSprite(prefab_sprites.MazeWalker):
     super(PlayerSprite, self).__init__(
         corner, position, character, impassable='')
 
+  # Column displacement for each action: swim leftward, swim rightward, and
+  # float along with the current.
+  _ACTION_DC = (-1, 1, 0)
+
   def update(self, actions, board, layers, backdrop, things, the_plot):
     del layers, backdrop, things   # Unused.
 
-    # Move one square left on even game iterations.
-    if the_plot.frame % 2 == 0:
-      self._west(board, the_plot)
-
-    # Apply swimming commands.
-    if actions == 0:    # swim leftward?
-      self._west(board, the_plot)
-    elif actions == 1:  # swim rightward?
-      self._east(board, the_plot)
+    # Add up the swimming command and the current, which sweeps the swimmer one
+    # square left on even game iterations. (The RiverBackdrop, which always
+    # updates first, has already worked out whether this is one of them.) The
+    # swimmer can go anywhere and the board never scrolls, so the two motions
+    # can be made in a single teleport.
+    dc = self._ACTION_DC[actions] if actions in (0, 1) else 0
+    if the_plot['current_flows']: dc -= 1
+    if dc:
+      row, col = self.virtual_position
+      self._teleport((row, col + dc))
 
     # See if the game is won or lost.
     if self.virtual_position[1] < 0:
@@ -106,14 +117,27 @@ class RiverBackdrop(plab_things.Backdrop):
   """A `Backdrop` for the river.
 
   This `Backdrop` rotates the river part of the backdrop leftward on every even
-  game iteration, making the river appear to be flowing.
+  game iteration, making the river appear to be flowing. It also records in the
+  `Plot` whether the current is flowing in the current game iteration, under
+  the key `'current_flows'`.
   """
 
+  def __init__(self, curtain, palette):
+    super(RiverBackdrop, self).__init__(curtain, palette)
+    # Scratch space for the column of river that wraps around when it flows.
+    # Rotating in place this way means we don't allocate a whole new river
+    # every frame, which `np.roll` would do.
+    self._column_buffer = np.empty(3, dtype=curtain.dtype)
+
   def update(self, actions, board, layers, things, the_plot):
     del actions, board, layers, things   # Unused.
 
-    if the_plot.frame % 2 == 0:
-      self.curtain[1:4, :] = np.roll(self.curtain[1:4, :], shift=-1, axis=1)
+    the_plot['current_flows'] = current_flows = the_plot.frame % 2 == 0
+    if current_flows:
+      river = self.curtain[1:4, :]
+      np.copyto(self._column_buffer, river[:, 0])
+      river[:, :-1] = river[:, 1:]
+      river[:, -1] = self._column_buffer
 
 
 def main(argv=()):
@@ -122,6 +146,11 @@ def main(argv=()):
   # Build a Fluvial Natation game.
   game = make_game()
 
+  # Without a human to play, feed the game random actions instead.
+  if os.environ.get('PYCOLAB_HEADLESS'):
+    headless.play(game, headless.random_policy([0, 1, 2]), verbose=True)
+    return
+
   # Make a CursesUi to play it with.
   ui = human_ui.CursesUi(
       keys_to_actions={curses.KEY_LEFT: 0, curses.KEY_RIGHT: 1, -1: 2},
@@ -0,0 +1,87 @@
+# Copyright 2017 the pycolab Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Play the example games without a human---or a terminal---in the loop.
+
+Some of the example games will play themselves headlessly if you set the
+`PYCOLAB_HEADLESS` environment variable when you run them, e.g.:
+
+    PYCOLAB_HEADLESS=1 PYTHONPATH=. python -B pycolab/examples/hello_world.py
+
+Instead of starting up a `CursesUi`, they'll use the `play` function in this
+module to feed the game random actions, then print a short summary of how
+things went. This is a handy way to see how quickly a game runs.
+
+It's also a handy way to try the games under PyPy, whose tracing JIT does very
+well with the small, branchy Python methods that make up most pycolab game
+logic. Headless play never initialises curses, so it works without a terminal.
+PyPy's numpy support is slower than CPython's, though, so games whose `update`
+methods avoid allocating new arrays on every frame (e.g. `np.roll`) benefit
+the most.
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import random
+import timeit
+
+
+def random_policy(actions, seed=None):
+  """Make a policy that ignores observations and chooses from `actions`.
+
+  Args:
+    actions: a sequence of actions to choose from uniformly at random.
+    seed: optional seed for the policy's random number generator.
+
+  Returns:
+    A callable that takes an observation and returns an action.
+  """
+  rng = random.Random(seed)
+  actions = list(actions)
+  return lambda observation: rng.choice(actions)
+
+
+def play(game, policy, max_steps=None, verbose=False):
+  """Play a pycolab game with actions from `policy`.
+
+  Args:
+    game: a pycolab game. This game must not have had its `its_showtime` method
+        called yet.
+    policy: a callable that takes an observation and returns an action.
+    max_steps: if not None, stop after this many calls to `game.play`, even if
+        the game is still underway.
+    verbose: if True, print a one-line summary of the game afterwards.
+
+  Returns:
+    A 2-tuple with the sum of all (non-None) rewards received during the game
+    and the number of calls made to `game.play`.
+  """
+  start_time = timeit.default_timer()
+
+  observation, reward, _ = game.its_showtime()
+  total_return = 0 if reward is None else reward
+  steps = 0
+  while not game.game_over and (max_steps is None or steps < max_steps):
+    observation, reward, _ = game.play(policy(observation))
+    if reward is not None: total_return += reward
+    steps += 1
+
+  if verbose:
+    elapsed = timeit.default_timer() - start_time
+    print('Return {} after {} steps ({:.0f} steps per second).'.format(
+        total_return, steps, steps / elapsed if elapsed else float('inf')))
+
+  return total_return, steps
@@ -22,14 +22,17 @@ from __future__ import division
 from __future__ import print_function
 
 import curses
+import os
 
 import numpy as np
 
 import sys
 
+from pycolab import _jit
 from pycolab import ascii_art
 from pycolab import human_ui
 from pycolab import things
+from pycolab.examples import headless
 
 
 HELLO_ART = ['                                    ',
@@ -47,6 +50,10 @@ HELLO_ART = ['                                    ',
              '                                    ']
 
 
+# HELLO_ART, already converted to the array ascii_art_to_game works with.
+HELLO_BOARD = ascii_art.ascii_art_to_uint8_nparray(HELLO_ART)
+
+
 HELLO_COLOURS = {' ': (123, 123, 123),  # Only used in this program by
                  '#': (595, 791, 928),  # the CursesUi.
                  '@': (54, 501, 772),
@@ -59,7 +66,7 @@ HELLO_COLOURS = {' ': (123, 123, 123),  # Only used in this program by
 def make_game():
   """Builds and returns a Hello World game."""
   return ascii_art.ascii_art_to_game(
-      HELLO_ART,
+      HELLO_BOARD,
       what_lies_beneath=' ',
       sprites={'1': ascii_art.Partial(SlidingSprite, 0),
                '2': ascii_art.Partial(SlidingSprite, 1),
@@ -70,12 +77,20 @@ def make_game():
 
 
 class RollingDrape(things.Drape):
-  """A Drape that just `np.roll`s the mask around either axis."""
+  """A Drape that just rolls the mask around either axis, like `np.roll`."""
 
   # There are four rolls to choose from: two shifts of size 1 along both axes.
   _ROLL_AXES = [0, 0, 1, 1]
   _ROLL_SHIFTS = [-1, 1, -1, 1]
 
+  def __init__(self, curtain, character):
+    super(RollingDrape, self).__init__(curtain, character)
+    # Scratch space for the row or column that wraps around during a roll.
+    # Rolling in place this way spares us allocating a whole new curtain each
+    # frame, as `np.roll` does.
+    self._row_buffer = np.empty(curtain.shape[1], dtype=curtain.dtype)
+    self._col_buffer = np.empty(curtain.shape[0], dtype=curtain.dtype)
+
   def update(self, actions, board, layers, backdrop, all_things, the_plot):
     del board, layers, backdrop, all_things  # unused
 
@@ -85,20 +100,41 @@ class RollingDrape(things.Drape):
     # If the player has chosen a motion action, use that action to index into
     # the set of four rolls.
     if actions < 4:
-      rolled = np.roll(self.curtain,  # Makes a copy, alas.
-                       self._ROLL_SHIFTS[actions], self._ROLL_AXES[actions])
-      np.copyto(self.curtain, rolled)
+      if _jit.ENABLED:
+        _roll_in_place(
+            self.curtain, self._ROLL_AXES[actions], self._ROLL_SHIFTS[actions])
+      else:
+        self._roll(self._ROLL_AXES[actions], self._ROLL_SHIFTS[actions])
       the_plot.add_reward(1)  # Give ourselves a point for moving.
 
+  def _roll(self, axis, shift):
+    """Roll the curtain in place by `shift` (+1 or -1) along `axis`."""
+    # Working on the transpose lets us treat column rolls like row rolls.
+    if axis == 0:
+      curtain, buf = self.curtain, self._row_buffer
+    else:
+      curtain, buf = self.curtain.T, self._col_buffer
+    if shift < 0:
+      np.copyto(buf, curtain[0])
+      curtain[:-1] = curtain[1:]
+      curtain[-1] = buf
+    else:
+      np.copyto(buf, curtain[-1])
+      curtain[1:] = curtain[:-1]
+      curtain[0] = buf
+
 
 class SlidingSprite(things.Sprite):
   """A Sprite that moves in diagonal directions."""
 
   # We have four mappings from actions to motions to choose from. The mappings
   # are arranged so that given any index i, then across all sets, the motion
-  # that undoes motion i always has the same index j.
-  _DX = ([-1, 1, -1, 1], [-1, 1, -1, 1], [1, -1, 1, -1], [1, -1, 1, -1])
-  _DY = ([-1, 1, 1, -1], [1, -1, -1, 1], [1, -1, -1, 1], [-1, 1, 1, -1])
+  # that undoes motion i always has the same index j. Motions are (row, col)
+  # displacements; the table is indexed by [direction_set, action].
+  _DELTA = np.array([[(-1, -1), (1, 1), (1, -1), (-1, 1)],
+                     [(1, -1), (-1, 1), (-1, -1), (1, 1)],
+                     [(1, 1), (-1, -1), (-1, 1), (1, -1)],
+                     [(-1, 1), (1, -1), (1, 1), (-1, -1)]], dtype=np.int8)
 
   def __init__(self, corner, position, character, direction_set):
     """Build a SlidingSprite.
@@ -111,18 +147,54 @@ class SlidingSprite(things.Sprite):
           mappings from actions to (diagonal) motions.
     """
     super(SlidingSprite, self).__init__(corner, position, character)
-    self._dx = self._DX[direction_set]
-    self._dy = self._DY[direction_set]
+    # Our slice of the table, as Python ints so that `update` arithmetic never
+    # strays into numpy scalar types.
+    self._delta = tuple(
+        tuple(motion) for motion in self._DELTA[direction_set].tolist())
 
   def update(self, actions, board, layers, backdrop, all_things, the_plot):
     del board, layers, backdrop, all_things, the_plot  # unused
     # Actions 0-3 are motion actions; the others we ignore.
     if actions is None or actions > 3: return
-    new_col = (self._position.col + self._dx[actions]) % self.corner.col
-    new_row = (self._position.row + self._dy[actions]) % self.corner.row
+    dy, dx = self._delta[actions]
+    new_row = (self._position.row + dy) % self.corner.row
+    new_col = (self._position.col + dx) % self.corner.col
     self._position = self.Position(new_row, new_col)
 
 
+# Compiled counterpart to RollingDrape._roll, used only if `_jit.ENABLED`.
+
+
+@_jit.njit
+def _roll_in_place(curtain, axis, shift):
+  """Roll `curtain` in place by `shift` (+1 or -1) along `axis`."""
+  rows, cols = curtain.shape
+  if axis == 0:
+    for col in range(cols):
+      if shift < 0:
+        wrapped = curtain[0, col]
+        for row in range(rows - 1):
+          curtain[row, col] = curtain[row + 1, col]
+        curtain[rows - 1, col] = wrapped
+      else:
+        wrapped = curtain[rows - 1, col]
+        for row in range(rows - 1, 0, -1):
+          curtain[row, col] = curtain[row - 1, col]
+        curtain[0, col] = wrapped
+  else:
+    for row in range(rows):
+      if shift < 0:
+        wrapped = curtain[row, 0]
+        for col in range(cols - 1):
+          curtain[row, col] = curtain[row, col + 1]
+        curtain[row, cols - 1] = wrapped
+      else:
+        wrapped = curtain[row, cols - 1]
+        for col in range(cols - 1, 0, -1):
+          curtain[row, col] = curtain[row, col - 1]
+        curtain[row, 0] = wrapped
+
+
 def main(argv=()):
   del argv  # Unused.
 
@@ -132,6 +204,12 @@ def main(argv=()):
   # Log a message in its Plot object.
   game.the_plot.log('Hello, world!')
 
+  # Without a human to play, feed the game random actions instead.
+  if os.environ.get('PYCOLAB_HEADLESS'):
+    headless.play(game, headless.random_policy([0, 1, 2, 3, 5]),
+                  max_steps=1000, verbose=True)
+    return
+
   # Make a CursesUi to play it with.
   ui = human_ui.CursesUi(
       keys_to_actions={curses.KEY_UP: 0, curses.KEY_DOWN: 1, curses.KEY_LEFT: 2,
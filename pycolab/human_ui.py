@@ -30,6 +30,10 @@ from pycolab.protocols import logging as plab_logging
 import six
 
 
+# Marks keycodes that aren't bound to any action. (None could be an action.)
+_NO_ACTION = object()
+
+
 class CursesUi(object):
   """A terminal-based UI for pycolab games."""
 
@@ -138,6 +142,14 @@ class CursesUi(object):
       raise TypeError('keys in the keys_to_actions argument must either be '
                       'numerical keycodes or single ASCII character strings.')
 
+    # For quick conversion during play, we also arrange the actions in a list
+    # indexed by keycode plus one (so that the timeout "keycode" -1 fits too).
+    # Keycodes that aren't bound to any action map to _NO_ACTION.
+    self._actions_by_keycode = [_NO_ACTION] * (
+        max([curses.KEY_MAX] + list(self._keycodes_to_actions)) + 2)
+    for key, action in six.iteritems(self._keycodes_to_actions):
+      if key >= -1: self._actions_by_keycode[key + 1] = action
+
     # We'd like to see whether the user is using any reserved keys here in the
     # constructor, but we have to wait until curses is actually running to do
     # that. So, the reserved key check happens in _init_curses_and_play.
@@ -157,6 +169,9 @@ class CursesUi(object):
     # we'll use when we're displaying that character. None for now, since we
     # can't set it up until curses is running.
     self._colour_pair = None
+    # Likewise, this slot will hold a list of the curses attributes for those
+    # colour pairs, indexed by ASCII codepoint, for fast lookup during display.
+    self._colour_attr = None
 
     # If the user specified no croppers or any None croppers, replace them with
     # pass-through croppers that don't do any cropping.
@@ -281,15 +296,16 @@ class CursesUi(object):
       # method. Note that the timeout "keycode" -1 is treated the same as any
       # other keycode here.
       keycode = screen.getch()
+      action = (self._actions_by_keycode[keycode + 1]
+                if -1 <= keycode < len(self._actions_by_keycode) - 1
+                else _NO_ACTION)
       if keycode == curses.KEY_PPAGE:    # Page Up? Show the game console.
         paint_console = True
       elif keycode == curses.KEY_NPAGE:  # Page Down? Hide the game console.
         paint_console = False
-      elif keycode in self._keycodes_to_actions:
-        # Convert the keycode to a game action and send that to the engine.
-        # Receive a new observation, reward, discount; crop and repaint; update
-        # total return.
-        action = self._keycodes_to_actions[keycode]
+      elif action is not _NO_ACTION:
+        # Send the game action for this keycode to the engine. Receive a new
+        # observation, reward, discount; crop and repaint; update total return.
         observation, reward, _ = self._game.play(action)
         observations = crop_and_repaint(observation)
         if self._total_return is None:
@@ -335,8 +351,7 @@ class CursesUi(object):
         # Display game board characters one-by-one. We iterate over them as
         # integer ASCII codepoints for easiest compatibility with python2/3.
         for codepoint in six.iterbytes(board_line.tostring()):
-          screen.addch(
-              codepoint, curses.color_pair(self._colour_pair[codepoint]))
+          screen.addch(codepoint, self._colour_attr[codepoint])
 
       # Advance the leftmost column for the next observation.
       leftmost_column += observation.board.shape[1] + 3
@@ -396,6 +411,18 @@ class CursesUi(object):
     colour pairs to accommodate the user-supplied colour dicts, this method will
     simply allow the default foreground and background colour to be used.
     """
+    self._init_colour_pairs()
+
+    # Look up the curses attribute for every codepoint's colour pair now, so
+    # that painting the board needn't do it again for every character.
+    self._colour_attr = [curses.color_pair(self._colour_pair[codepoint])
+                         for codepoint in range(256)]
+
+  def _init_colour_pairs(self):
+    """Helper for `_init_colour`: fill `self._colour_pair` and program curses.
+
+    See `_init_colour` for details.
+    """
     # The default colour for all characters without colours listed is boring
     # white on black, or "system default", or somesuch.
     self._colour_pair = collections.defaultdict(lambda: 0)
@@ -65,6 +65,32 @@ class Observation(collections.namedtuple('Observation', ['board', 'layers'])):
   __slots__ = ()
 
 
+def _make_layers(rows, cols, characters):
+  """Allocate the layers of an observation renderer.
+
+  All of the layers are slices of a single 3-D array, so that renderers can
+  compute all of them with a single numpy operation instead of one per layer.
+
+  Args:
+    rows: height of the game board.
+    cols: width of the game board.
+    characters: an iterable of ASCII characters that are allowed to appear
+        on the game board.
+
+  Returns:
+    A 3-tuple with the following members:
+      * The `(len(characters), rows, cols)` `np.bool_` array of all the layers.
+      * A `(len(characters), 1, 1)` `np.uint8` array of the ASCII values of
+        the characters for each layer, in the same order.
+      * A dict mapping each character to its layer in the 3-D array.
+  """
+  characters = list(collections.OrderedDict.fromkeys(characters))
+  layer_stack = np.zeros((len(characters), rows, cols), dtype=np.bool_)
+  layer_codes = np.array([ord(char) for char in characters],
+                         dtype=np.uint8).reshape(-1, 1, 1)
+  return layer_stack, layer_codes, dict(zip(characters, layer_stack))
+
+
 class BaseObservationRenderer(object):
   """Renderer of "base" pycolab observations.
 
@@ -92,8 +118,12 @@ class BaseObservationRenderer(object):
           on the game board. (A string will work as an argument here.)
     """
     self._board = np.zeros((rows, cols), dtype=np.uint8)
-    self._layers = {
-        char: np.zeros((rows, cols), dtype=np.bool_) for char in characters}
+    self._layer_stack, self._layer_codes, self._layers = _make_layers(
+        rows, cols, characters)
+    # ASCII values for the paint_* methods, also used to validate characters.
+    self._codes = {char: np.uint8(ord(char)) for char in self._layers}
+    # The board and layers are reused for every rendering, and so is this.
+    self._observation = Observation(board=self._board, layers=self._layers)
 
   def clear(self):
     """Reset the "canvas" of this `BaseObservationRenderer`.
@@ -133,10 +163,11 @@ class BaseObservationRenderer(object):
       ValueError: `character` is not a valid character for this game, according
           to the `Engine`'s configuration.
     """
-    if character not in self._layers:
+    code = self._codes.get(character)
+    if code is None:
       raise ValueError('character {} does not seem to be a valid character for '
                        'this game'.format(str(character)))
-    self._board[tuple(position)] = ord(character)
+    self._board[tuple(position)] = code
 
   def paint_drape(self, character, curtain):
     """Fill a masked area on the "canvas" of this `BaseObservationRenderer`.
@@ -154,10 +185,11 @@ class BaseObservationRenderer(object):
       ValueError: `character` is not a valid character for this game, according
           to the `Engine`'s configuration.
     """
-    if character not in self._layers:
+    code = self._codes.get(character)
+    if code is None:
       raise ValueError('character {} does not seem to be a valid character for '
                        'this game'.format(str(character)))
-    self._board[curtain] = ord(character)
+    self._board[curtain] = code
 
   def render(self):
     """Derive an `Observation` from this `BaseObservationRenderer`'s "canvas".
@@ -174,9 +206,8 @@ class BaseObservationRenderer(object):
       presented to this `BaseObservationRenderer` since the last call to its
       `clear()` method.
     """
-    for character, layer in six.iteritems(self._layers):
-      np.equal(self._board, ord(character), out=layer)
-    return Observation(board=self._board, layers=self._layers)
+    np.equal(self._board, self._layer_codes, out=self._layer_stack)
+    return self._observation
 
   @property
   def shape(self):
@@ -203,8 +234,12 @@ class BaseUnoccludedObservationRenderer(object):
           on the game board. (A string will work as an argument here.)
     """
     self._board = np.zeros((rows, cols), dtype=np.uint8)
-    self._layers = {
-        char: np.zeros((rows, cols), dtype=np.bool_) for char in characters}
+    self._layer_stack, self._layer_codes, self._layers = _make_layers(
+        rows, cols, characters)
+    # ASCII values for the paint_* methods, also used to validate characters.
+    self._codes = {char: np.uint8(ord(char)) for char in self._layers}
+    # The board and layers are reused for every rendering, and so is this.
+    self._observation = Observation(board=self._board, layers=self._layers)
 
   def clear(self):
     """Reset the "canvas" of this renderer.
@@ -214,8 +249,7 @@ class BaseUnoccludedObservationRenderer(object):
     `np.bool_(False)` values.
     """
     self._board.fill(0)
-    for layer in six.itervalues(self._layers):
-      layer.fill(False)
+    self._layer_stack.fill(False)
 
   def paint_all_of(self, curtain):
     """Copy a pattern onto the "canvas" of this renderer.
@@ -229,8 +263,7 @@ class BaseUnoccludedObservationRenderer(object):
           renderer's.
     """
     np.copyto(self._board, curtain, casting='no')
-    for character, layer in six.iteritems(self._layers):
-      np.equal(curtain, ord(character), out=layer)
+    np.equal(curtain, self._layer_codes, out=self._layer_stack)
 
   def paint_sprite(self, character, position):
     """Draw a character onto the "canvas" of this renderer.
@@ -248,11 +281,12 @@ class BaseUnoccludedObservationRenderer(object):
       ValueError: `character` is not a valid character for this game, according
           to the `Engine`'s configuration.
     """
-    if character not in self._layers:
+    code = self._codes.get(character)
+    if code is None:
       raise ValueError('character {} does not seem to be a valid character for '
                        'this game'.format(str(character)))
     position = tuple(position)
-    self._board[position] = ord(character)
+    self._board[position] = code
     self._layers[character][position] = True
 
   def paint_drape(self, character, curtain):
@@ -271,10 +305,11 @@ class BaseUnoccludedObservationRenderer(object):
       ValueError: `character` is not a valid character for this game, according
           to the `Engine`'s configuration.
     """
-    if character not in self._layers:
+    code = self._codes.get(character)
+    if code is None:
       raise ValueError('character {} does not seem to be a valid character for '
                        'this game'.format(str(character)))
-    self._board[curtain] = ord(character)
+    self._board[curtain] = code
     np.copyto(self._layers[character], curtain)
 
   def render(self):
@@ -293,7 +328,7 @@ class BaseUnoccludedObservationRenderer(object):
       picking the one with the highest z-ordering. The `layers` show all
       characters, whether or not they have been occluded in the `board`.
     """
-    return Observation(board=self._board, layers=self._layers)
+    return self._observation
 
   @property
   def shape(self):
@@ -0,0 +1,138 @@
+# Copyright 2017 the pycolab Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the Aperture example game."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import sys
+import unittest
+
+from pycolab import ascii_art
+from pycolab.examples import aperture
+from pycolab.tests import test_things as tt
+
+
+# Actions for firing the blaster up, left, down, and right.
+_UP, _LEFT, _DOWN, _RIGHT = 5, 6, 7, 8
+
+
+class ApertureTest(tt.PycolabTestCase):
+
+  def _make_game(self, art):
+    """Build and start an Aperture game on a board of our own."""
+    game = ascii_art.ascii_art_to_game(
+        art, what_lies_beneath=' ',
+        sprites={'A': aperture.PlayerSprite},
+        drapes={'X': aperture.ApertureDrape},
+        update_schedule=[['A'], ['X']], z_order=['X', 'A'])
+    game.its_showtime()
+    return game
+
+  def testShootingOffTheBoard(self):
+    """Shots from the edge of the board, straight off of it, go nowhere."""
+    for jit in (False, True):
+      self.forceJit(jit)
+
+      # In the top-left corner, shots up and to the left have no cells to cross.
+      game = self._make_game(['A C@',
+                              '#.  '])
+      for action in (_UP, _LEFT):
+        observation, _, _ = game.play(action)
+        self.assertBoard(observation.board, ['A C@',
+                                             '#.  '])
+        self.assertEqual(game.things['X'].apertures, ())
+
+      # But a shot to the right can still reach the opposite edge.
+      observation, _, _ = game.play(_RIGHT)
+      self.assertBoard(observation.board, ['A CX',
+                                           '#.  '])
+      self.assertEqual(game.things['X'].apertures, ((0, 3),))
+
+      # Likewise for shots down and to the right from the bottom-right corner.
+      game = self._make_game(['#.C ',
+                              '@  A'])
+      for action in (_DOWN, _RIGHT):
+        observation, _, _ = game.play(action)
+        self.assertBoard(observation.board, ['#.C ',
+                                             '@  A'])
+        self.assertEqual(game.things['X'].apertures, ())
+
+      observation, _, _ = game.play(_LEFT)
+      self.assertBoard(observation.board, ['#.C ',
+                                           'X  A'])
+      self.assertEqual(game.things['X'].apertures, ((1, 0),))
+
+  def testMakingAndReplacingApertures(self):
+    """Shots at special walls make apertures, replacing the oldest of two."""
+    for jit in (False, True):
+      self.forceJit(jit)
+      game = self._make_game(['#######',
+                              '#@ A @#',
+                              '#. @ C#',
+                              '#######'])
+      drape = game.things['X']
+
+      def shoot(action, expected_art, expected_apertures):
+        observation, _, _ = game.play(action)
+        self.assertBoard(observation.board, expected_art)
+        self.assertEqual(drape.apertures, expected_apertures)
+        # The curtain marks just the apertures, and the tuple of apertures
+        # doesn't change unless an aperture is made.
+        self.assertEqual(
+            sorted(zip(*drape.curtain.nonzero())), sorted(expected_apertures))
+        self.assertIs(drape.apertures, drape.apertures)
+
+      # Ordinary walls stop the beam.
+      shoot(_UP, ['#######',
+                  '#@ A @#',
+                  '#. @ C#',
+                  '#######'], ())
+
+      # Shots at special walls make the first aperture, then the second.
+      shoot(_LEFT, ['#######',
+                    '#X A @#',
+                    '#. @ C#',
+                    '#######'], ((1, 1),))
+      shoot(_RIGHT, ['#######',
+                     '#X A X#',
+                     '#. @ C#',
+                     '#######'], ((1, 1), (1, 5)))
+
+      # Existing apertures stop the beam too.
+      shoot(_LEFT, ['#######',
+                    '#X A X#',
+                    '#. @ C#',
+                    '#######'], ((1, 1), (1, 5)))
+
+      # A third aperture replaces the oldest one, whose wall is special again.
+      shoot(_DOWN, ['#######',
+                    '#@ A X#',
+                    '#. X C#',
+                    '#######'], ((1, 5), (2, 3)))
+      shoot(_LEFT, ['#######',
+                    '#X A @#',
+                    '#. X C#',
+                    '#######'], ((2, 3), (1, 1)))
+
+
+def main(argv=()):
+  del argv  # Unused.
+  unittest.main()
+
+
+if __name__ == '__main__':
+  main(sys.argv)
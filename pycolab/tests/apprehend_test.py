@@ -0,0 +1,119 @@
+# Copyright 2017 the pycolab Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the Apprehend example game."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import random
+import sys
+import unittest
+
+from pycolab.examples import apprehend
+
+
+class _FixedOffset(object):
+  """Stands in for the `random` module, so the ball falls where we like."""
+
+  def __init__(self, offset):
+    self._offset = offset
+
+  def uniform(self, a, b):
+    del a, b  # Unused.
+    return self._offset
+
+
+def _float_trajectory(offset, rows=10, col=3):
+  """The ball's path as Apprehend computed it with floating-point numbers.
+
+  Args:
+    offset: total horizontal distance the ball should travel as it falls.
+    rows: height of the game board.
+    col: column where the ball starts.
+
+  Returns:
+    the ball's positions at the end of each game iteration, as (row, col)
+    tuples, from the first row below the top of the board to the first row
+    beyond the bottom.
+  """
+  dx = offset / (rows - 1.0)
+  accumulator = 0.0
+  trajectory = []
+  for row in range(1, rows + 1):
+    accumulator += dx
+    if accumulator < -0.5:
+      col -= 1
+      accumulator += 1.0
+    elif accumulator > 0.5:
+      col += 1
+      accumulator -= 1.0
+    trajectory.append((row, col))
+  return trajectory
+
+
+class ApprehendTest(unittest.TestCase):
+
+  def _trajectory(self, offset):
+    """The ball's path in an Apprehend game where it falls `offset` sideways."""
+    self.addCleanup(setattr, apprehend, 'random', apprehend.random)
+    apprehend.random = _FixedOffset(offset)
+
+    game = apprehend.make_game()
+    game.its_showtime()
+    trajectory = [tuple(game.things['b'].virtual_position)]
+    while not game.game_over:
+      game.play(2)  # The player stays put.
+      trajectory.append(tuple(game.things['b'].virtual_position))
+    return trajectory
+
+  def assertSameTrajectory(self, offset):
+    trajectory = self._trajectory(offset)
+    # The game ends early if the ball falls onto the player.
+    self.assertEqual(trajectory,
+                     _float_trajectory(offset)[:len(trajectory)],
+                     'offset {!r}'.format(offset))
+
+  def testRandomTrajectories(self):
+    """The ball falls just as it did when its motion was computed in floats."""
+    rng = random.Random(0)
+    for _ in range(1000):
+      self.assertSameTrajectory(rng.uniform(-2.499, 2.499))
+
+  def testTrajectoriesNearRoundingBoundaries(self):
+    """The ball moves sideways just as it did, even in the closest of calls."""
+    # After k of the 9 rows of the fall, the ball has moved k/9ths of the way
+    # sideways, and it changes column whenever that distance passes a half-way
+    # point between columns. We try offsets that put it just short of or just
+    # past such a point, for each k. (Right on one of these points, the old
+    # code's rounding errors decided which way the ball went, so we don't test
+    # those.)
+    for k in range(1, 10):
+      for halves in range(1, 10, 2):
+        boundary = 4.5 * halves / k
+        if boundary >= 2.499: continue
+        for epsilon in (1e-4, 1e-6, 1e-7, 1e-9, 1e-12):
+          for offset in (boundary - epsilon, boundary + epsilon):
+            self.assertSameTrajectory(offset)
+            self.assertSameTrajectory(-offset)
+
+
+def main(argv=()):
+  del argv  # Unused.
+  unittest.main()
+
+
+if __name__ == '__main__':
+  main(sys.argv)
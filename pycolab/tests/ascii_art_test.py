@@ -24,12 +24,15 @@ from __future__ import print_function
 import sys
 import unittest
 
+import numpy as np
+
 from pycolab import ascii_art
+from pycolab.tests import test_things as tt
 
 import six
 
 
-class AsciiArtTest(unittest.TestCase):
+class AsciiArtTest(tt.PycolabTestCase):
 
   def testRaiseErrors(self):
     """Checks how `ascii_art_to_uint8_nparray` handles incorrect input."""
@@ -58,6 +61,100 @@ class AsciiArtTest(unittest.TestCase):
         TypeError, 'Did you pass a list of list of single characters?'):
       _ = ascii_art.ascii_art_to_uint8_nparray(art)
 
+  def testNumpyArrayArt(self):
+    """Checks that `ascii_art_to_uint8_nparray` accepts converted art."""
+    board = ascii_art.ascii_art_to_uint8_nparray(['ab', 'ba'])
+
+    # Converted art comes back unchanged, but as a copy.
+    copy = ascii_art.ascii_art_to_uint8_nparray(board)
+    np.testing.assert_array_equal(board, copy)
+    self.assertFalse(np.may_share_memory(board, copy))
+
+    # So a game built from the array doesn't scribble on the original.
+    game = ascii_art.ascii_art_to_game(board, what_lies_beneath=' ',
+                                       drapes={'a': tt.TestDrape})
+    game.its_showtime()
+    np.testing.assert_array_equal(board, [[97, 98], [98, 97]])
+
+    # Incorrect input: wrong dtype or number of dimensions.
+    for board in (board.astype(np.int32), board.ravel()):
+      with six.assertRaisesRegex(
+          self,
+          ValueError, 'or a 2-D uint8 numpy array of ASCII values'):
+        _ = ascii_art.ascii_art_to_uint8_nparray(board)
+
+  def testCachedLayout(self):
+    """Checks that games built with `cache=True` are fresh but identical."""
+    art = ['#P.#',
+           '#.a#']
+
+    def make_game(cache):
+      return ascii_art.ascii_art_to_game(
+          art, what_lies_beneath='.',
+          sprites={'P': tt.TestSprite}, drapes={'a': tt.TestDrape},
+          update_schedule=['a', 'P'], cache=cache)
+
+    expected, _, _ = make_game(cache=False).its_showtime()
+    games = [make_game(cache=True) for _ in range(2)]
+    for game in games:
+      observation, _, _ = game.its_showtime()
+      np.testing.assert_array_equal(observation.board, expected.board)
+      self.assertEqual(game.things['P'].position, (0, 1))
+      self.assertEqual(game.z_order, ['a', 'P'])
+
+    # The two games must not share any state.
+    games[0].things['a'].curtain[0, 0] = True
+    self.assertFalse(games[1].things['a'].curtain[0, 0])
+    games[0].backdrop.curtain[1, 1] = ord('#')
+    self.assertEqual(games[1].backdrop.curtain[1, 1], ord('.'))
+
+  def testCompiledLayoutMatchesNumpy(self):
+    """`_compile_layout` gives the same layout with or without JIT kernels."""
+    art = ['#####',
+           '#P.a#',
+           '#.aQ#',
+           '#b..#',
+           '#####']
+    beneath_art = ['#####',
+                   '#,,,#',
+                   '#.:.#',
+                   '#~~~#',
+                   '#####']
+
+    # Try a single character beneath, and a whole board of characters beneath.
+    for what_lies_beneath in ('.', beneath_art):
+      layouts = []
+      for jit in (False, True):
+        self.forceJit(jit)
+        layouts.append(ascii_art._compile_layout(  # pylint: disable=protected-access
+            art, what_lies_beneath, sprite_characters=['P', 'Q'],
+            drape_characters=['a', 'b'],
+            update_schedule=[['a', 'P'], ['Q', 'b']], z_order=None))
+      expected, actual = layouts
+
+      self.assertEqual(actual.update_schedule, expected.update_schedule)
+      self.assertEqual(actual.z_order, expected.z_order)
+      self.assertEqual(actual.positions, expected.positions)
+      self.assertEqual(actual.backdrop_characters, expected.backdrop_characters)
+      np.testing.assert_array_equal(actual.backdrop_art, expected.backdrop_art)
+      self.assertEqual(sorted(actual.curtains), sorted(expected.curtains))
+      for character, curtain in six.iteritems(expected.curtains):
+        np.testing.assert_array_equal(actual.curtains[character], curtain)
+
+    # Spot-check the last layout, with the board of characters beneath.
+    self.assertEqual(actual.positions, {'P': (1, 1), 'Q': (2, 3)})
+    self.assertEqual(actual.backdrop_characters, '#,.:~')
+    self.assertBoard(actual.backdrop_art, ['#####',
+                                           '#,.,#',
+                                           '#.:.#',
+                                           '#~..#',
+                                           '#####'])
+    np.testing.assert_array_equal(actual.curtains['a'], [[0, 0, 0, 0, 0],
+                                                         [0, 0, 0, 1, 0],
+                                                         [0, 0, 1, 0, 0],
+                                                         [0, 0, 0, 0, 0],
+                                                         [0, 0, 0, 0, 0]])
+
 
 def main(argv=()):
   del argv  # Unused.
@@ -0,0 +1,196 @@
+# Copyright 2017 the pycolab Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the classic reinforcement learning example games."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import sys
+import unittest
+
+import numpy as np
+
+from pycolab.examples.classics import batch_chain_walk
+from pycolab.examples.classics import batch_cliff_walk
+from pycolab.examples.classics import chain_walk
+from pycolab.examples.classics import cliff_walk
+
+import six
+
+
+class _ArrayModule(object):
+  """Stands in for an array module like `cupy`, but just passes on to numpy.
+
+  Records the names of all of the numpy attributes it's asked for.
+  """
+
+  def __init__(self):
+    self.names_used = set()
+
+  def __getattr__(self, name):
+    self.names_used.add(name)
+    return getattr(np, name)
+
+
+class BatchGamesTest(unittest.TestCase):
+
+  def assertLockstep(self, batch, make_game, position, actions):
+    """Play `batch` and one single game per batch member in lockstep.
+
+    Args:
+      batch: a `BatchChainWalk` or `BatchCliffWalk`, freshly reset.
+      make_game: returns a new single-game `Engine` for the same game.
+      position: given one of those `Engine`s, returns the player's position in
+          the same form as one entry of `batch.pos`.
+      actions: a steps-by-`batch.n` array of actions.
+    """
+    games = [make_game() for _ in range(batch.n)]
+    for game, pos in zip(games, batch.pos):
+      game.its_showtime()
+      np.testing.assert_array_equal(position(game), pos)
+
+    for step, step_actions in enumerate(actions):
+      last_pos = batch.pos.copy()
+      pos, rewards, done = batch.step(step_actions)
+      for i, (game, action) in enumerate(zip(games, step_actions)):
+        err_msg = 'game {}, step {}'.format(i, step)
+        if game.game_over:
+          # Finished games ignore all further actions.
+          np.testing.assert_array_equal(pos[i], last_pos[i], err_msg)
+          self.assertEqual(rewards[i], 0.0, err_msg)
+          self.assertTrue(done[i], err_msg)
+        else:
+          _, reward, _ = game.play(int(action))
+          np.testing.assert_array_equal(pos[i], position(game), err_msg)
+          self.assertEqual(rewards[i], reward or 0.0, err_msg)
+          self.assertEqual(done[i], game.game_over, err_msg)
+
+    # The batch should have played out at least some games in full.
+    self.assertTrue(any(game.game_over for game in games))
+
+  def testBatchChainWalk(self):
+    """`BatchChainWalk` plays by the same rules as `chain_walk`."""
+    rng = np.random.RandomState(0)
+    batch = batch_chain_walk.BatchChainWalk(n=32)
+    self.assertLockstep(batch, chain_walk.make_game,
+                        lambda game: game.things['P'].position[1],
+                        rng.randint(0, 3, size=(300, batch.n)))
+
+    # Resetting starts all of the games over again.
+    pos = batch.reset()
+    np.testing.assert_array_equal(pos, [2] * batch.n)
+    self.assertFalse(batch.done.any())
+
+  def testBatchCliffWalk(self):
+    """`BatchCliffWalk` plays by the same rules as `cliff_walk`."""
+    rng = np.random.RandomState(0)
+    batch = batch_cliff_walk.BatchCliffWalk(n=32)
+    # Actions -2, -1, 4 and 5 are ignored, as in cliff_walk.
+    self.assertLockstep(batch, cliff_walk.make_game,
+                        lambda game: tuple(game.things['P'].position),
+                        rng.randint(-2, 6, size=(100, batch.n)))
+
+    # An ignored action costs nothing, even on the bottom row, where moving
+    # would end the game.
+    batch.reset()
+    _, rewards, done = batch.step(np.array([-1, 4] * (batch.n // 2)))
+    np.testing.assert_array_equal(batch.pos, [(3, 0)] * batch.n)
+    self.assertFalse(rewards.any())
+    self.assertFalse(done.any())
+
+    pos = batch.reset()
+    np.testing.assert_array_equal(pos, [(3, 0)] * batch.n)
+    self.assertFalse(batch.done.any())
+
+  def testArrayModule(self):
+    """Batched games do their work with the array module they're given."""
+    rng = np.random.RandomState(0)
+    for batch_class, low, high in (
+        (batch_chain_walk.BatchChainWalk, 0, 3),
+        (batch_cliff_walk.BatchCliffWalk, -2, 6)):
+      xp = _ArrayModule()
+      batches = [batch_class(n=16), batch_class(n=16, xp=xp)]
+      for step_actions in rng.randint(low, high, size=(50, 16)):
+        expected, actual = [batch.step(step_actions) for batch in batches]
+        for expected_array, actual_array in zip(expected, actual):
+          np.testing.assert_array_equal(actual_array, expected_array)
+      self.assertIn('where', xp.names_used)
+
+
+class CliffWalkTest(unittest.TestCase):
+
+  def _play(self, game, actions):
+    """Play `actions` in `game` until it ends, recording every step."""
+    history = []
+    observation, reward, discount = game.its_showtime()
+    for action in actions:
+      history.append((observation.board.tobytes(), reward, discount,
+                      game.things['P'].position, game.game_over))
+      if game.game_over: break
+      observation, reward, discount = game.play(action)
+    return history
+
+  def testFastPlayerSprite(self):
+    """`PlayerSpriteFast` plays exactly like `PlayerSprite`."""
+    rng = np.random.RandomState(0)
+    for rows, cols in ((None, None), (2, 3), (5, 8)):
+      for _ in range(30):
+        # Actions 4 and 5 are ignored, and there are plenty of attempts to walk
+        # off the edges of the board.
+        actions = rng.randint(0, 6, size=100)
+        expected = self._play(cliff_walk.make_game(rows, cols), actions)
+        actual = self._play(cliff_walk.make_game(rows, cols, fast=True),
+                            actions)
+        self.assertEqual(actual, expected)
+
+  def testBoardSize(self):
+    """Cliff walks can be played on boards of other sizes."""
+    game = cliff_walk.make_game(rows=3, cols=5)
+    observation, _, _ = game.its_showtime()
+    np.testing.assert_array_equal(
+        observation.board, [[ord(c) for c in row] for row in ['.....',
+                                                             '.....',
+                                                             'P....']])
+
+    # Walk up, around the cliff, and down into the bottom-right corner.
+    rewards = []
+    for action in (0, 3, 3, 3, 3, 1):
+      _, reward, _ = game.play(action)
+      rewards.append(reward)
+    self.assertEqual(rewards, [-1.0] * 6)
+    self.assertTrue(game.game_over)
+    self.assertEqual(game.things['P'].position, (2, 4))
+
+    # Stepping straight into the cliff is costly.
+    game = cliff_walk.make_game(rows=3, cols=5)
+    game.its_showtime()
+    _, reward, _ = game.play(3)
+    self.assertEqual(reward, -100.0)
+    self.assertTrue(game.game_over)
+
+    # Boards too small to have a cliff are refused.
+    for rows, cols in ((1, 12), (4, 2), (1, 1)):
+      with six.assertRaisesRegex(self, ValueError, 'at least 2x3 cells'):
+        cliff_walk.make_game(rows, cols)
+
+
+def main(argv=()):
+  del argv  # Unused.
+  unittest.main()
+
+
+if __name__ == '__main__':
+  main(sys.argv)
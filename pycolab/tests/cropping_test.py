@@ -21,11 +21,29 @@ from __future__ import print_function
 import sys
 import unittest
 
+import numpy as np
+
 from pycolab import ascii_art
 from pycolab import cropping
 from pycolab import things as plab_things
 from pycolab.tests import test_things as tt
 
+import six
+
+
+class _WindowCropper(cropping.ObservationCropper):
+  """A cropper whose window can be moved and resized between crops."""
+
+  def __init__(self, pad_char):
+    super(_WindowCropper, self).__init__()
+    self._pad_char = pad_char
+    self.window = (0, 0, 1, 1)  # Top row, left column, rows, cols.
+
+  def crop(self, observation):
+    top_row, left_col, rows, cols = self.window
+    return self._do_crop(observation, top_row, left_col,
+                         top_row + rows, left_col + cols, self._pad_char)
+
 
 class CroppingTest(tt.PycolabTestCase):
 
@@ -259,6 +277,72 @@ class CroppingTest(tt.PycolabTestCase):
         ],
     )
 
+  def testViewOk(self):
+    """With `view_ok`, croppers return views of crops that need no padding."""
+
+    # Our test takes place in this world.
+    art = ['.......',
+           '.#####.',
+           '.#P  #.',
+           '.#####.',
+           '.......']
+
+    # One of these croppers lies entirely inside the observation; the other
+    # hangs off the top of it.
+    inside = cropping.FixedCropper((1, 1), rows=3, cols=5, view_ok=True)
+    overhang = cropping.FixedCropper(
+        (-1, 1), rows=3, cols=5, pad_char=' ', view_ok=True)
+    engine = self.make_engine(art, [inside, overhang])
+    observation, _, _ = engine.play('e')
+
+    # The inside crop is a view of the observation.
+    cropped = inside.crop(observation)
+    np.testing.assert_array_equal(
+        cropped.board, ascii_art.ascii_art_to_uint8_nparray(['#####',
+                                                             '# P #',
+                                                             '#####']))
+    self.assertTrue(np.may_share_memory(cropped.board, observation.board))
+    for char, layer in cropped.layers.items():
+      self.assertTrue(np.may_share_memory(layer, observation.layers[char]))
+      np.testing.assert_array_equal(layer, observation.layers[char][1:4, 1:6])
+
+    # The overhanging crop needs padding, so it's a copy.
+    cropped = overhang.crop(observation)
+    np.testing.assert_array_equal(
+        cropped.board, ascii_art.ascii_art_to_uint8_nparray(['     ',
+                                                             '.....',
+                                                             '#####']))
+    self.assertFalse(np.may_share_memory(cropped.board, observation.board))
+
+  def testLazyLayers(self):
+    """With `lazy_layers`, croppers compute the same layers on demand."""
+
+    # Our test takes place in this world.
+    art = ['.......',
+           '.#####.',
+           '.#P %#.',
+           '.#####.',
+           '.......']
+
+    # Identical croppers, except for laziness.
+    croppers = [cropping.FixedCropper((-1, 1), rows=4, cols=5, pad_char=' '),
+                cropping.FixedCropper((-1, 1), rows=4, cols=5, pad_char=' ',
+                                      lazy_layers=True)]
+    engine = self.make_engine(art, croppers)
+    observation, _, _ = engine.play('e')
+
+    eager, lazy = [cropper.crop(observation) for cropper in croppers]
+    np.testing.assert_array_equal(lazy.board, eager.board)
+    self.assertEqual(sorted(lazy.layers), sorted(eager.layers))
+    for char in eager.layers:
+      np.testing.assert_array_equal(lazy.layers[char], eager.layers[char])
+
+    # Lazy layers can't be derived from boards without occlusion in layers.
+    engine = ascii_art.ascii_art_to_game(
+        art, what_lies_beneath=' ', occlusion_in_layers=False)
+    with six.assertRaisesRegex(self, ValueError, 'occlusion_in_layers'):
+      croppers[1].set_engine(engine)
+
   def testEgocentricScrolling(self):
     """Basic egocentric scrolling works as advertised."""
 
@@ -653,6 +737,130 @@ class CroppingTest(tt.PycolabTestCase):
     )
     # pylint: enable=bad-whitespace
 
+  def testDrapeCentroids(self):
+    """Drape centroids are the medians of True indices, rounded down."""
+    cropper = cropping.ScrollingCropper(
+        rows=3, cols=3, to_track=['%'], scroll_margins=(None, None))
+
+    def centroid(art):
+      curtain = np.array([[char == '%' for char in row] for row in art])
+      drape = tt.TestDrape(curtain, '%')
+      return cropper._centroid(drape, is_sprite=False)  # pylint: disable=protected-access
+
+    # An empty drape has no centroid.
+    self.assertIsNone(centroid(['    ',
+                                '    ']))
+
+    # With an odd number of True elements, the median is one of them.
+    self.assertEqual(centroid(['%   ',
+                               '    ',
+                               '   %',
+                               '   %']), (2, 3))
+
+    # With an even number, it falls between two of them and rounds down: here,
+    # the rows are (0, 0, 3, 4) and the columns are (0, 1, 1, 4).
+    self.assertEqual(centroid(['%%   ',
+                               '     ',
+                               '     ',
+                               ' %   ',
+                               '    %']), (1, 1))
+
+    # The two middle indices can also be the same, or neighbours: the rows are
+    # (1, 1, 1, 1, 2, 3) and the columns are (0, 1, 2, 3, 3, 3).
+    self.assertEqual(centroid(['    ',
+                               '%%%%',
+                               '   %',
+                               '   %']), (1, 2))
+
+    # Random drapes, lopsided and sparse, agree with numpy's median.
+    rng = np.random.RandomState(0)
+    for density in (0.02, 0.1, 0.5):
+      for _ in range(50):
+        curtain = rng.rand(9, 13) < density
+        curtain[:, :4] &= rng.rand(9, 4) < density  # Thin out the left side.
+        if not curtain.any(): continue
+        expected = tuple(int(np.median(indices))
+                         for indices in curtain.nonzero())
+        art = [''.join('%' if cell else ' ' for cell in row) for row in curtain]
+        self.assertEqual(centroid(art), expected)
+
+  def testNoStaleCells(self):
+    """Reused cropped observations keep nothing from earlier crops."""
+
+    # Our test takes place in this world, full of different characters.
+    art = ['#######',
+           '#a.b.c#',
+           '#.%%%.#',
+           '#d%P%e#',
+           '#.%%%.#',
+           '#f.g.h#',
+           '#######']
+    engine = ascii_art.ascii_art_to_game(
+        art=art, what_lies_beneath='.',
+        sprites={'P': ascii_art.Partial(tt.TestMazeWalker, impassable='#')},
+        drapes={'%': tt.TestDrape})
+    observation, _, _ = engine.its_showtime()
+
+    cropper = _WindowCropper(pad_char='#')
+    cropper.set_engine(engine)
+
+    def assert_crop(window):
+      """Crop `observation` with `window`; compare with padding it by hand."""
+      cropper.window = window
+      cropped = cropper.crop(observation)
+      top_row, left_col, rows, cols = window
+      margin = 20
+      pick = np.s_[top_row + margin:top_row + margin + rows,
+                   left_col + margin:left_col + margin + cols]
+      np.testing.assert_array_equal(
+          cropped.board,
+          np.pad(observation.board, margin, 'constant',
+                 constant_values=ord('#'))[pick], 'window {}'.format(window))
+      self.assertEqual(sorted(cropped.layers), sorted(observation.layers))
+      for char, layer in observation.layers.items():
+        np.testing.assert_array_equal(
+            cropped.layers[char],
+            np.pad(layer, margin, 'constant',
+                   constant_values=char == '#')[pick],
+            'window {}, layer {!r}'.format(window, char))
+
+    # The window overhangs the board, then lies inside it, then overhangs it
+    # again on a different side, then leaves the board altogether.
+    for window in ((-2, -1, 4, 5), (1, 1, 4, 5), (2, 0, 4, 5), (4, 5, 4, 5),
+                   (1, 2, 4, 5), (-9, 3, 4, 5), (0, 0, 4, 5)):
+      assert_crop(window)
+
+    # Crops of one size, then another, then the first size again, reuse the
+    # observation from the first crop even though the window has moved.
+    for window in ((-1, -1, 3, 3), (2, 2, 5, 5), (1, 1, 3, 3), (5, 4, 5, 5),
+                   (-2, 5, 3, 3), (3, 3, 3, 3), (0, 0, 5, 5), (6, -2, 3, 3)):
+      assert_crop(window)
+
+    # Many random windows of more sizes than the pool has room for, as the
+    # player walks around the board and changes it.
+    rng = np.random.RandomState(0)
+    sizes = [(3, 3), (5, 5), (3, 4), (4, 3), (2, 6), (7, 7)]
+    for _ in range(300):
+      if rng.rand() < 0.2:
+        observation, _, _ = engine.play(rng.choice(['n', 's', 'e', 'w']))
+      rows, cols = sizes[rng.randint(len(sizes))]
+      assert_crop((rng.randint(-rows - 1, 9), rng.randint(-cols - 1, 9),
+                   rows, cols))
+
+
+class CroppingJitTest(CroppingTest):
+  """Runs all of `CroppingTest` again, with `_jit.ENABLED` forced on.
+
+  With JIT enabled, `ScrollingCropper` moves its window with `_scroll_corner`
+  and finds `Drape` centroids with `_curtain_centroid`. The tests above cover
+  saccades, scroll margins, initial offsets, and `Drape` centroids, and must
+  come out the same either way.
+  """
+
+  def setUp(self):
+    super(CroppingJitTest, self).setUp()
+    self.forceJit(True)
+
 
 def main(argv=()):
   del argv  # Unused.
@@ -29,10 +29,13 @@ import sys
 import unittest
 
 from pycolab import ascii_art
+from pycolab import engine as plab_engine
 from pycolab import rendering
 from pycolab import things as plab_things
 from pycolab.tests import test_things as tt
 
+import six
+
 
 class EngineTest(tt.PycolabTestCase):
 
@@ -294,6 +297,64 @@ class EngineTest(tt.PycolabTestCase):
     observation, unused_reward, unused_discount = engine.play(None)
     self.assertBoard(observation.board, ['..a..'])
 
+  def testSeveralZOrderChangesInOneFrame(self):
+    """Z-order changes made in one frame are applied in the order requested."""
+    # Our test takes place in a world where all four sprites share a cell, so
+    # the board always shows whichever of them is at the front.
+    engine = ascii_art.ascii_art_to_game(
+        art=['.a.'], what_lies_beneath='.',
+        sprites={c: ascii_art.Partial(tt.TestMazeWalker, impassable='')
+                 for c in 'abcd'},
+        update_schedule='abcd', z_order='abcd')
+    for character in 'bcd':
+      engine.things[character]._teleport((0, 1))  # pylint: disable=protected-access
+    engine.its_showtime()
+
+    def change_z_order(directives):
+      tt.pre_update(engine, 'a',
+                    lambda actions, board, layers, backdrop, things, the_plot: [
+                        the_plot.change_z_order(move_this, in_front_of_that)
+                        for move_this, in_front_of_that in directives])
+      observation, _, _ = engine.play(None)
+      return observation
+
+    # Each change sees the z-order left by the ones before it: 'abcd' becomes
+    # 'bcda', then 'bcad', then 'dbca'.
+    observation = change_z_order([('a', None), ('a', 'c'), ('d', None)])
+    self.assertEqual(engine.z_order, ['d', 'b', 'c', 'a'])
+    self.assertBoard(observation.board, ['.a.'])
+
+    # Moving a Sprite in front of itself changes nothing, whether it comes
+    # before, after, or between other changes.
+    observation = change_z_order([('c', 'c')])
+    self.assertEqual(engine.z_order, ['d', 'b', 'c', 'a'])
+    observation = change_z_order([('b', 'b'), ('b', 'a'), ('b', 'b')])
+    self.assertEqual(engine.z_order, ['d', 'c', 'a', 'b'])
+    self.assertBoard(observation.board, ['.b.'])
+
+    # Many random sequences of changes give the same z-order as applying the
+    # changes one at a time, each time rebuilding the z-order from scratch.
+    def one_at_a_time(z_order, directives):
+      for move_this, in_front_of_that in directives:
+        if move_this == in_front_of_that: continue
+        new_z_order = [move_this] if in_front_of_that is None else []
+        for character in z_order:
+          if character == move_this: continue
+          new_z_order.append(character)
+          if character == in_front_of_that: new_z_order.append(move_this)
+        z_order = new_z_order
+      return z_order
+
+    rng = np.random.RandomState(0)
+    characters = ['a', 'b', 'c', 'd']
+    for _ in range(200):
+      directives = [(rng.choice(characters), rng.choice(characters + [None]))
+                    for _ in range(rng.randint(1, 6))]
+      expected = one_at_a_time(engine.z_order, directives)
+      observation = change_z_order(directives)
+      self.assertEqual(engine.z_order, expected)
+      self.assertBoard(observation.board, ['.{}.'.format(expected[-1])])
+
   def testPlotStateVariables(self):
     """State variables inside the Plot are updated correctly."""
 
@@ -639,6 +700,59 @@ class EngineTest(tt.PycolabTestCase):
     self.assertBoard(observation.board, ['cb',
                                          'bb'])
 
+  def testPrefilledCurtains(self):
+    """Prefilled curtains are copies, and prefills must fit the board."""
+    engine = plab_engine.Engine(rows=2, cols=3)
+
+    prefill = np.array([[True, False, True], [False, True, False]])
+    drape = engine.add_prefilled_drape('d', prefill, tt.TestDrape)
+    np.testing.assert_array_equal(drape.curtain, prefill)
+    self.assertFalse(np.may_share_memory(drape.curtain, prefill))
+    self.assertTrue(drape.curtain.flags.c_contiguous)
+
+    # Prefills of the wrong shape or dtype are rejected.
+    with six.assertRaisesRegex(self, ValueError, 'same shape as the game'):
+      engine.add_prefilled_drape('e', prefill[:, :2], tt.TestDrape)
+    with six.assertRaisesRegex(self, TypeError, 'to prefill a curtain'):
+      engine.add_prefilled_drape('e', prefill.astype(np.uint8), tt.TestDrape)
+    with six.assertRaisesRegex(self, TypeError, 'to prefill a curtain'):
+      engine.set_prefilled_backdrop('.', prefill, plab_things.Backdrop)
+
+    # Non-prefilled entities start out blank.
+    self.assertFalse(engine.add_drape('e', tt.TestDrape).curtain.any())
+    backdrop = engine.set_backdrop('.', plab_things.Backdrop)
+    self.assertFalse(backdrop.curtain.any())
+
+  def testCharacterValidation(self):
+    """Only single ASCII characters may be claimed by game entities."""
+    engine = plab_engine.Engine(rows=2, cols=3)
+    with six.assertRaisesRegex(self, ValueError, 'not an ASCII character'):
+      engine.add_drape(u'\xe9', tt.TestDrape)
+    with six.assertRaisesRegex(self, ValueError, 'not an ASCII character'):
+      engine.set_backdrop(u'.\u03bb', plab_things.Backdrop)
+    with six.assertRaisesRegex(self, ValueError, 'a string of length 2'):
+      engine.add_sprite('ab', (0, 0), tt.TestSprite)
+
+  def testBackdropUpdates(self):
+    """A Backdrop that overrides update() is updated on every frame."""
+
+    class StripeBackdrop(plab_things.Backdrop):
+
+      def update(self, actions, board, layers, things, the_plot):
+        self.curtain[:, the_plot.frame % 3] = self.palette['#']
+
+    engine = plab_engine.Engine(rows=2, cols=3)
+    engine.set_prefilled_backdrop(
+        '.#', np.full((2, 3), ord('.'), dtype=np.uint8), StripeBackdrop)
+    engine.add_drape('d', tt.TestDrape)
+
+    observation, _, _ = engine.its_showtime()
+    self.assertBoard(observation.board, ['#..',
+                                         '#..'])
+    observation, _, _ = engine.play(None)
+    self.assertBoard(observation.board, ['##.',
+                                         '##.'])
+
   def _assertMask(self, actual_mask, mask_art, err_msg=''):  # pylint: disable=invalid-name
     """Compares numpy bool_ arrays with "art" drawn as lists of '0' and '1'."""
     np.testing.assert_array_equal(
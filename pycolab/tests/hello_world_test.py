@@ -0,0 +1,69 @@
+# Copyright 2017 the pycolab Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the Hello World example game."""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import sys
+import unittest
+
+import numpy as np
+
+from pycolab.examples import hello_world
+from pycolab.tests import test_things as tt
+
+
+class HelloWorldTest(tt.PycolabTestCase):
+
+  def _play(self, jit, actions):
+    """Play `actions` in a new game; return its boards and rewards."""
+    self.forceJit(jit)
+    game = hello_world.make_game()
+    observation, reward, _ = game.its_showtime()
+    history = [(observation.board.copy(), reward)]
+    for action in actions:
+      observation, reward, _ = game.play(action)
+      history.append((observation.board.copy(), reward))
+    return history
+
+  def testRollingKernelMatchesNumpy(self):
+    """RollingDrape's compiled roll moves the drape just like the numpy one."""
+    # Enough steps in each direction to wrap all the way around the board.
+    rng = np.random.RandomState(0)
+    actions = [0] * 14 + [3] * 37 + [1] * 14 + [2] * 37 + list(
+        rng.choice([0, 1, 2, 3, 5], size=300))
+
+    expected = self._play(False, actions)
+    actual = self._play(True, actions)
+    self.assertEqual(len(expected), len(actual))
+    for i, ((board, reward), (jit_board, jit_reward)) in enumerate(
+        zip(expected, actual)):
+      np.testing.assert_array_equal(jit_board, board, 'frame {}'.format(i))
+      self.assertEqual(jit_reward, reward)
+
+    # Moving all the way around the board puts everything back where it was.
+    np.testing.assert_array_equal(expected[14 + 37 + 14 + 37][0],
+                                  hello_world.HELLO_BOARD)
+
+
+def main(argv=()):
+  del argv  # Unused.
+  unittest.main()
+
+
+if __name__ == '__main__':
+  main(sys.argv)
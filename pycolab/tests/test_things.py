@@ -53,6 +53,7 @@ import unittest
 
 import numpy as np
 
+from pycolab import _jit
 from pycolab import ascii_art
 from pycolab import cropping
 from pycolab import things as plab_things
@@ -317,6 +318,20 @@ class PycolabTestCase(unittest.TestCase):
                                   ascii_art.ascii_art_to_uint8_nparray(art),
                                   err_msg)
 
+  def forceJit(self, enabled):  # pylint: disable=invalid-name
+    """Override `_jit.ENABLED` for the rest of the current test.
+
+    Code that checks `_jit.ENABLED` at call time will take its kernel branch
+    if `enabled` is True, or its numpy branch if not. Without numba, kernels
+    are plain Python functions, so this lets both branches be tested anywhere.
+    The original value is restored when the test finishes.
+
+    Args:
+      enabled: the value `_jit.ENABLED` should have for the rest of the test.
+    """
+    self.addCleanup(setattr, _jit, 'ENABLED', _jit.ENABLED)
+    _jit.ENABLED = enabled
+
   def expectBoard(self, art, err_msg=''):  # pylint: disable=invalid-name
     """Produce a callable that invokes `assertBoard`.
 
@@ -83,6 +83,7 @@ setuptools.setup(
     ],
     extras_require={
         'ndimage': ['scipy>=0.13.3'],
+        'jit': ['numba'],
     },
 
     packages=setuptools.find_packages(),